@@ -0,0 +1,69 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Microbenchmark of status label updates
+
+Compares building a markup string & set_markup with set_styled_text
+(set_text + cached Pango.AttrList), it needs a display to run.
+
+usage: python3 bench_markup.py [iterations]
+"""
+import sys
+import time
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk
+
+from widgets import get_font_markup, set_styled_text
+
+
+def markup_update(label, txt):
+    """ the old way, a markup string parsed by Pango on every update """
+    txt = f'<span foreground="#BF360C" weight="bold">{txt}</span>'
+    label.set_markup(get_font_markup('Noto Sans Regular 14', txt))
+
+
+def styled_update(label, txt):
+    set_styled_text(label, txt, font='Noto Sans Regular 14', color='#BF360C', weight='bold')
+
+
+def run(update, iterations):
+    label = Gtk.Label()
+    start = time.perf_counter()
+    for i in range(iterations):
+        update(label, f'Row {i} was selected')
+        # get the layout, so the label text is laid out, like when it is drawn
+        label.get_layout()
+    return time.perf_counter() - start
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    Gtk.init()
+    # warm up the style cache & Pango font lookup
+    run(markup_update, 10)
+    run(styled_update, 10)
+    for name, update in [('set_markup', markup_update), ('set_styled_text', styled_update)]:
+        elapsed = run(update, iterations)
+        print(f'{name:<16} : {elapsed:8.3f} s  {elapsed / iterations * 1e6:8.2f} us/update')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Microbenchmark of live value updates on RowObjects
+
+Compares setting a watched property directly (a notify per change) with
+RowObject.update (the notifications is batched and emitted once per frame).
+A frame is simulated by changing a number of random rows, then flushing the batch.
+No display is needed.
+
+usage: python3 bench_notify.py [rows] [updates per frame]
+"""
+import random
+import sys
+import time
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import GObject
+
+from widgets import RowObject, NotifyBatch
+
+
+class LiveValue(RowObject):
+    value = GObject.Property(type=float, default=0.0)
+
+
+def run(items, frames, per_frame, batched):
+    notified = [0]
+
+    def on_notify(item, pspec):
+        # like a bound row updating its label
+        notified[0] += 1
+        str(item.value)
+
+    handlers = [(item, item.connect('notify::value', on_notify)) for item in items]
+    rows = [random.randrange(len(items)) for _ in range(per_frame)]
+    start = time.perf_counter()
+    for frame in range(frames):
+        for ndx in rows:
+            item = items[ndx]
+            if batched:
+                item.update(value=frame)
+            else:
+                item.value = frame
+        if batched:
+            LiveValue.batch.flush()
+    elapsed = time.perf_counter() - start
+    for item, handler_id in handlers:
+        item.disconnect(handler_id)
+    return elapsed, notified[0]
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    per_frame = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    frames = 60
+    LiveValue.batch = NotifyBatch()
+    items = [LiveValue() for _ in range(n_rows)]
+    print(f'{n_rows} rows, {per_frame} updates per frame, {frames} frames')
+    for name, batched in [('set property', False), ('update (batched)', True)]:
+        elapsed, notified = run(items, frames, per_frame, batched)
+        print(f'{name:<18} : {elapsed / frames * 1000:8.2f} ms/frame  {notified / frames:10.0f} notify/frame')
+
+
+if __name__ == '__main__':
+    main()
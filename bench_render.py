@@ -0,0 +1,176 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Render time benchmark of the MyWindow pages
+
+Each page is laid out at a number of window sizes, snapshot and rendered to a texture with
+the Cairo renderer (no GPU needed). GTK4 has no offscreen windows, so the window is realized
+(it has a surface, but it is not shown) and its content is mapped & allocated directly.
+If the offscreen snapshot is empty (it depends on the GTK version), the window is presented
+and the pages is snapshot through a Gtk.WidgetPaintable, the offscreen column tells which was used.
+The snapshot & render times, number of render nodes and number of widgets is written as a table,
+or as json with --json.
+
+It needs a display connection (not a visible window), to run headless use a virtual display, ex.
+    xvfb-run python3 bench_render.py
+
+usage: python3 bench_render.py [--json] [--runs N] [--onscreen]
+"""
+import argparse
+import json
+import os.path
+import sys
+import tempfile
+import time
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Gsk", "4.0")
+from gi.repository import Gtk, Gsk, GLib
+
+from main import Application, MyWindow
+from widgets import SessionState
+
+SIZES = [(800, 600), (1280, 800), (1920, 1080)]
+
+
+def wait_for_frames(widget, frames=3, timeout=2.0):
+    """ run the main loop until the widget has been drawn a number of frames """
+    drawn = []
+
+    def on_tick(widget, frame_clock):
+        drawn.append(frame_clock.get_frame_counter())
+        return GLib.SOURCE_CONTINUE if len(drawn) < frames else GLib.SOURCE_REMOVE
+
+    widget.add_tick_callback(on_tick)
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while len(drawn) < frames and time.monotonic() < deadline:
+        context.iteration(False)
+
+
+def count_nodes(node) -> int:
+    """ count the render nodes in a render node tree """
+    if node is None:
+        return 0
+    count = 1
+    if hasattr(node, 'get_n_children'):
+        for ndx in range(node.get_n_children()):
+            count += count_nodes(node.get_child(ndx))
+    elif hasattr(node, 'get_child'):
+        count += count_nodes(node.get_child())
+    return count
+
+
+def count_widgets(widget) -> int:
+    return 1 + sum(count_widgets(child) for child in widget)
+
+
+def snapshot_offscreen(widget):
+    """ snapshot a mapped & allocated widget through its parent, without a frame being drawn """
+    snapshot = Gtk.Snapshot()
+    widget.get_parent().snapshot_child(widget, snapshot)
+    return snapshot.to_node()
+
+
+def snapshot_paintable(widget):
+    """ snapshot the last frame drawn of a widget in a presented window """
+    paintable = Gtk.WidgetPaintable.new(widget)
+    snapshot = Gtk.Snapshot()
+    paintable.snapshot(snapshot, widget.get_width(), widget.get_height())
+    return snapshot.to_node()
+
+
+def allocate_offscreen(win, width, height):
+    """ map & allocate the window content, without showing the window """
+    win.realize()
+    content = win.get_child()
+    if not content.get_mapped():
+        content.map()
+    content.allocate(width, height, -1, None)
+
+
+def measure(widget, renderer, runs, snapshot_func):
+    """ best time of a number of snapshot & render runs """
+    snapshot_time = render_time = float('inf')
+    node = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        node = snapshot_func(widget)
+        snapshot_time = min(snapshot_time, time.perf_counter() - start)
+        start = time.perf_counter()
+        if node is not None:
+            renderer.render_texture(node, None)
+        render_time = min(render_time, time.perf_counter() - start)
+    return snapshot_time, render_time, count_nodes(node)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render time benchmark of the MyWindow pages')
+    parser.add_argument('--json', action='store_true', help='write the result as json')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs per page & size (best is used)')
+    parser.add_argument('--onscreen', action='store_true', help='present the window, instead of offscreen snapshots')
+    args = parser.parse_args()
+
+    app = Application()
+    app.register(None)
+    # don't save the benchmark window sizes in the user state
+    app.state = SessionState(os.path.join(tempfile.mkdtemp(), 'state.json'))
+    renderer = Gsk.CairoRenderer()
+    renderer.realize(None)
+    results = []
+    offscreen = not args.onscreen
+    for width, height in SIZES:
+        win = MyWindow("Render Benchmark", width, height, application=app)
+        win.set_default_size(width, height)
+        if not offscreen:
+            win.present()
+        for page in win.stack.get_pages():
+            child = page.get_child()
+            win.stack.set_visible_child(child)
+            if offscreen:
+                allocate_offscreen(win, width, height)
+                if snapshot_offscreen(child) is None:
+                    print('offscreen snapshot is empty, the window is presented', file=sys.stderr)
+                    offscreen = False
+                    win.present()
+            if not offscreen:
+                wait_for_frames(win)
+            snapshot_func = snapshot_offscreen if offscreen else snapshot_paintable
+            snapshot_time, render_time, nodes = measure(child, renderer, args.runs, snapshot_func)
+            results.append({'page': page.get_name(), 'width': width, 'height': height, 'offscreen': offscreen,
+                            'snapshot_ms': snapshot_time * 1000, 'render_ms': render_time * 1000,
+                            'render_nodes': nodes, 'widgets': count_widgets(child)})
+        win.destroy()
+    renderer.unrealize()
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print(f'{"page":<8}{"size":>11}{"offscreen":>10}{"snapshot ms":>13}{"render ms":>11}{"nodes":>8}{"widgets":>9}')
+        for result in results:
+            size = f'{result["width"]}x{result["height"]}'
+            print(f'{result["page"]:<8}{size:>11}{str(result["offscreen"]):>10}{result["snapshot_ms"]:>13.2f}'
+                  f'{result["render_ms"]:>11.2f}'
+                  f'{result["render_nodes"]:>8}{result["widgets"]:>9}')
+
+
+if __name__ == '__main__':
+    main()
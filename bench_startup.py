@@ -0,0 +1,162 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Startup time benchmark of MyWindow with the pages build from ui templates vs. an older commit
+
+The older commit (default: the last commit with the pages build in Python code) is
+extracted with git archive to a temporary directory. Each tree is run in a new process,
+so the cold startup (process start to the first frame of the first window) is measured,
+then a number of windows is build in the same process, to get the warm build time
+(the best run is used).
+
+It needs a display, to run headless use a virtual display, ex.
+    xvfb-run python3 bench_startup.py
+
+usage: python3 bench_startup.py [--json] [--runs N] [--ref COMMIT]
+"""
+import startup  # imported first, startup.START is used as the process start time
+
+import argparse
+import json
+import os.path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_for_frames(widget, frames=1, timeout=2.0):
+    """ run the main loop until the widget has been drawn a number of frames """
+    from gi.repository import GLib
+    drawn = []
+
+    def on_tick(widget, frame_clock):
+        drawn.append(frame_clock.get_frame_counter())
+        return GLib.SOURCE_CONTINUE if len(drawn) < frames else GLib.SOURCE_REMOVE
+
+    widget.add_tick_callback(on_tick)
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while len(drawn) < frames and time.monotonic() < deadline:
+        context.iteration(False)
+
+
+def count_widgets(widget) -> int:
+    return 1 + sum(count_widgets(child) for child in widget)
+
+
+def run_tree(tree, runs):
+    """ build the windows of the tree in this process and write the result as json on the last line of stdout """
+    # older trees load the css & ui files relative to the current directory
+    os.chdir(tree)
+    sys.path.insert(0, tree)
+    from gi.repository import GLib
+    from main import Application, MyWindow
+
+    imported = time.perf_counter()
+    app = Application()
+    app.register(None)
+    if hasattr(app, 'state'):
+        # don't save the benchmark window sizes in the user state
+        from widgets import SessionState
+        app.state = SessionState(os.path.join(tempfile.mkdtemp(), 'state.json'))
+    build_times = []
+    frame_times = []
+    widgets = 0
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        win = MyWindow("Startup Benchmark", 800, 800, application=app)
+        built = time.perf_counter()
+        win.present()
+        wait_for_frames(win)
+        build_times.append(built - start)
+        frame_times.append(time.perf_counter() - start)
+        if not widgets:
+            widgets = count_widgets(win)
+            startup_time = time.perf_counter() - startup.START
+        win.destroy()
+        context = GLib.MainContext.default()
+        while context.pending():
+            context.iteration(False)
+    result = {'import_ms': (imported - startup.START) * 1000, 'startup_ms': startup_time * 1000,
+              'cold_build_ms': build_times[0] * 1000, 'build_ms': min(build_times[1:]) * 1000,
+              'first_frame_ms': min(frame_times[1:]) * 1000, 'widgets': widgets}
+    print(json.dumps(result))
+
+
+def git(*args) -> str:
+    return subprocess.run(['git', *args], cwd=BASE_DIR, check=True, stdout=subprocess.PIPE,
+                          text=True).stdout.strip()
+
+
+def default_ref() -> str:
+    """ the last commit before the page templates was added """
+    added = git('log', '--diff-filter=A', '--format=%H', '-1', '--', 'page1.ui')
+    return f'{added}^' if added else 'HEAD'
+
+
+def extract(ref: str) -> str:
+    """ extract the tree of a commit to a temporary directory """
+    tree = tempfile.mkdtemp(prefix='bench-startup-')
+    archive = subprocess.run(['git', 'archive', ref], cwd=BASE_DIR, check=True, stdout=subprocess.PIPE).stdout
+    subprocess.run(['tar', '-x', '-C', tree], input=archive, check=True)
+    return tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup time benchmark of the template pages vs. an older commit')
+    parser.add_argument('--json', action='store_true', help='write the result as json')
+    parser.add_argument('--runs', type=int, default=5, help='number of warm window builds per tree (best is used)')
+    parser.add_argument('--ref', help='commit to compare with (default: the last commit without page templates)')
+    parser.add_argument('--tree', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.tree:
+        run_tree(args.tree, max(args.runs, 1))
+        return
+
+    ref = args.ref or default_ref()
+    trees = [('template', BASE_DIR), (git('rev-parse', '--short', ref), extract(ref))]
+    results = []
+    for name, tree in trees:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--tree', tree, '--runs', str(args.runs)],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if proc.returncode:
+            print(f'Error running {name} : {proc.stderr}')
+            continue
+        result = json.loads(proc.stdout.splitlines()[-1])
+        result['pages'] = name
+        results.append(result)
+    shutil.rmtree(trees[1][1], ignore_errors=True)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print(f'{"pages":<10}{"import ms":>11}{"startup ms":>12}{"cold build ms":>15}{"build ms":>10}'
+              f'{"first frame ms":>16}{"widgets":>9}')
+        for result in results:
+            print(f'{result["pages"]:<10}{result["import_ms"]:>11.1f}{result["startup_ms"]:>12.1f}'
+                  f'{result["cold_build_ms"]:>15.1f}{result["build_ms"]:>10.1f}'
+                  f'{result["first_frame_ms"]:>16.1f}{result["widgets"]:>9}')
+
+
+if __name__ == '__main__':
+    main()
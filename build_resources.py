@@ -0,0 +1,52 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Compile main.css, the page templates (page1.ui ...) & the shortcuts window into example.gresource
+
+shortcuts.ui is written from the accelerators of APP_ACTIONS in main.py first, so it is up to date.
+The bundle is loaded by main.py at startup if it exists, otherwise the
+files are read from the source directory.
+"""
+import os.path
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_shortcuts():
+    """ write shortcuts.ui with the actions of APP_ACTIONS """
+    sys.path.insert(0, BASE_DIR)
+    from main import APP_ACTIONS
+    first, rest = APP_ACTIONS.get_shortcuts_xml().split('\n', 1)
+    with open(os.path.join(BASE_DIR, 'shortcuts.ui'), 'w') as f:
+        f.write(f"{first}\n<!-- generated from APP_ACTIONS in main.py by build_resources.py, don't edit -->\n{rest}\n")
+
+
+def main():
+    write_shortcuts()
+    cmd = ['glib-compile-resources',
+           f'--sourcedir={BASE_DIR}',
+           f'--target={os.path.join(BASE_DIR, "example.gresource")}',
+           os.path.join(BASE_DIR, 'example.gresource.xml')]
+    print(' '.join(cmd))
+    return subprocess.call(cmd)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+ColumnView over a large SQLite table, using SQLiteListModel
+
+The first run creates a table with a number of rows (default 10M) in the user cache dir,
+that takes some time. Click a column header to sort, type in the search entry to filter,
+both is done by the database. The time to open the model & the number of queries is printed.
+
+usage: python3 demo_sqlite.py [--rows N]
+"""
+import argparse
+import os.path
+import random
+import sqlite3
+import sys
+import time
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, GObject, GLib
+
+from sqlmodel import SQLiteListModel
+from widgets import ViewColumnBase
+
+DB_FILE = os.path.join(GLib.get_user_cache_dir(), 'gtk4-python-example', 'demo.db')
+COLUMNS = ['name', 'size', 'owner']
+
+
+class FileElem(GObject.GObject):
+    """ data element for a row in the files table """
+
+    def __init__(self, row: dict):
+        super(FileElem, self).__init__()
+        self.row = row
+
+
+def create_db(fn: str, n_rows: int):
+    """ create the files table with n_rows random rows """
+    os.makedirs(os.path.dirname(fn), exist_ok=True)
+    db = sqlite3.connect(fn)
+    db.execute('DROP TABLE IF EXISTS files')
+    db.execute('CREATE TABLE files (name TEXT, size INTEGER, owner TEXT)')
+    owners = ['root', 'tim', 'jane', 'www', 'nobody']
+    batch = 100000
+    for start in range(0, n_rows, batch):
+        db.executemany('INSERT INTO files VALUES (?, ?, ?)',
+                       ((f'file-{ndx:08d}.txt', random.randrange(1 << 30), random.choice(owners))
+                        for ndx in range(start, min(start + batch, n_rows))))
+        print(f'\rcreating {fn} : {min(start + batch, n_rows)} rows', end='')
+    print()
+    # indexes for sorting
+    for column in COLUMNS:
+        db.execute(f'CREATE INDEX files_{column} ON files ({column})')
+    db.commit()
+    db.close()
+
+
+class SQLiteColumn(ViewColumnBase):
+    """ ColumnViewColumn showing a column from a shared SQLiteListModel """
+
+    def __init__(self, store: SQLiteListModel, col_view: Gtk.ColumnView, column: str):
+        self.column = column
+        self._store = store
+        super(SQLiteColumn, self).__init__(FileElem, col_view)
+        self.set_title(column.capitalize())
+        self.set_expand(True)
+
+    def setup_store(self, model_cls):
+        return self._store
+
+    def factory_setup(self, widget, item: Gtk.ListItem):
+        label = Gtk.Label()
+        label.set_halign(Gtk.Align.START)
+        label.set_margin_start(10)
+        item.set_child(label)
+
+    def factory_bind(self, widget, item: Gtk.ListItem):
+        item.get_child().set_text(str(item.get_item().row[self.column]))
+
+    def factory_unbind(self, widget, item: Gtk.ListItem):
+        pass
+
+    def factory_teardown(self, widget, item: Gtk.ListItem):
+        pass
+
+    def selection_changed(self, widget, ndx):
+        pass
+
+
+def has_table(fn: str) -> bool:
+    if not os.path.exists(fn):
+        return False
+    db = sqlite3.connect(fn)
+    found = db.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'files'").fetchone()[0]
+    db.close()
+    return found > 0
+
+
+def on_activate(app, n_rows):
+    if not has_table(DB_FILE):
+        create_db(DB_FILE, n_rows)
+    start = time.perf_counter()
+    store = SQLiteListModel(FileElem, DB_FILE, 'files', COLUMNS, FileElem)
+    print(f'model with {store.get_n_items()} rows opened in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    win = Gtk.ApplicationWindow(application=app, title='SQLite ListModel')
+    win.set_default_size(800, 600)
+    box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+    entry = Gtk.SearchEntry()
+    box.append(entry)
+    col_view = Gtk.ColumnView()
+    columns = {}
+    for column in COLUMNS:
+        view_column = SQLiteColumn(store, col_view, column)
+        col_view.append_column(view_column)
+        columns[view_column] = column
+    store.bind_column_view(col_view, columns)
+    sw = Gtk.ScrolledWindow()
+    sw.set_vexpand(True)
+    sw.set_child(col_view)
+    box.append(sw)
+    win.set_child(box)
+
+    def on_search(entry):
+        start = time.perf_counter()
+        store.set_filter(entry.get_text())
+        print(f'filter {entry.get_text()!r} : {store.get_n_items()} rows in '
+              f'{(time.perf_counter() - start) * 1000:.1f} ms')
+
+    def on_close(win):
+        print(f'{store.queries} queries')
+        return False
+
+    entry.connect('search-changed', on_search)
+    win.connect('close-request', on_close)
+    win.present()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ColumnView over a large SQLite table')
+    parser.add_argument('--rows', type=int, default=10000000, help='rows in the table, when it is created')
+    args = parser.parse_args()
+    app = Gtk.Application(application_id='dk.rasmil.Example.SQLite')
+    app.connect('activate', on_activate, args.rows)
+    return app.run(sys.argv[:1])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
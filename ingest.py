@@ -0,0 +1,294 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Data ingestion in worker processes, with shared memory handoff to a Gio.ListModel
+
+CPU heavy parsing is run in a ProcessPoolExecutor, so it is not limited by the GIL.
+The workers write the parsed rows as columns in a multiprocessing.shared_memory block
+and only a small descriptor (shared memory name & number of rows) is sent back to the UI process,
+where the columns are appended to a ColumnarListModel. The row objects for the view is
+only created, when the view asks for them.
+
+Columns are defined as a list of (name, typecode), where typecode is an array typecode
+(ex. 'q' for int, 'd' for float) or 's' for strings.
+"""
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from multiprocessing import resource_tracker, shared_memory
+from threading import Lock
+
+from gi.repository import GLib, GObject, Gio
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """ attach to an existing shared memory block, without registering it in the resource tracker """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _create(size: int) -> shared_memory.SharedMemory:
+    """ create a shared memory block, it is not registered in the resource tracker of the worker,
+    the Ingestor unlinks it
+    """
+    try:
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        # Python < 3.13
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _free(name: str):
+    """ unlink a shared memory block, there will not be read """
+    try:
+        shm = _attach(name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _parse_chunk(parse_func, columns: list, chunk):
+    """ Runs in the worker process: parse a chunk and write the rows as columns in shared memory """
+    rows = parse_func(chunk)
+    parts = []
+    for ndx, (name, typecode) in enumerate(columns):
+        values = [row[ndx] for row in rows]
+        if typecode == 's':
+            encoded = [value.encode('utf-8') for value in values]
+            # n + 1 offsets into the text
+            parts.append(array('q', accumulate([len(value) for value in encoded], initial=0)).tobytes())
+            parts.append(b''.join(encoded))
+        else:
+            parts.append(array(typecode, values).tobytes())
+    size = sum(len(part) for part in parts)
+    shm = _create(max(size, 1))
+    try:
+        pos = 0
+        for part in parts:
+            shm.buf[pos:pos + len(part)] = part
+            pos += len(part)
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    name = shm.name
+    shm.close()
+    return name, len(rows)
+
+
+def _read_columns(name: str, n_rows: int, columns: list) -> dict:
+    """ Runs in the UI process: copy the columns out of shared memory and free it """
+    shm = _attach(name)
+    result = {}
+    try:
+        pos = 0
+        for col_name, typecode in columns:
+            if typecode == 's':
+                offsets = array('q')
+                size = (n_rows + 1) * offsets.itemsize
+                offsets.frombytes(shm.buf[pos:pos + size])
+                pos += size
+                text = bytes(shm.buf[pos:pos + offsets[-1]])
+                pos += offsets[-1]
+                result[col_name] = (offsets, text)
+            else:
+                values = array(typecode)
+                size = n_rows * values.itemsize
+                values.frombytes(shm.buf[pos:pos + size])
+                pos += size
+                result[col_name] = values
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+
+class ColumnarListModel(GObject.GObject, Gio.ListModel):
+    """ Gio.ListModel with the data stored in columns
+
+    item_factory(row) creates the item for a row (a dict with column name -> value),
+    it is only called when the item is requested, the last cache_size items is cached.
+    It can be used as data model in a ListViewBase or ViewColumnBase, by returning it in setup_store
+    """
+    cache_size = 1000
+
+    def __init__(self, item_type, columns: list, item_factory):
+        super(ColumnarListModel, self).__init__()
+        self.item_type = item_type
+        self.columns = columns
+        self.item_factory = item_factory
+        self._chunks = []
+        self._starts = []
+        self._n_items = 0
+        self._cache = OrderedDict()
+
+    def do_get_item_type(self):
+        return self.item_type.__gtype__
+
+    def do_get_n_items(self):
+        return self._n_items
+
+    def do_get_item(self, position):
+        if position >= self._n_items:
+            return None
+        item = self._cache.get(position)
+        if item is None:
+            item = self.item_factory(self.get_row(position))
+            self._cache[position] = item
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(position)
+        return item
+
+    def get_row(self, position: int) -> dict:
+        """ get the values of a row, as a dict with column name -> value """
+        # find the chunk containing the position
+        lo, hi = 0, len(self._starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._starts[mid] <= position:
+                lo = mid
+            else:
+                hi = mid - 1
+        chunk = self._chunks[lo]
+        ndx = position - self._starts[lo]
+        row = {}
+        for name, typecode in self.columns:
+            if typecode == 's':
+                offsets, text = chunk[name]
+                row[name] = text[offsets[ndx]:offsets[ndx + 1]].decode('utf-8')
+            else:
+                row[name] = chunk[name][ndx]
+        return row
+
+    def snapshot(self) -> 'ColumnarListModel':
+        """ a copy of the model with the current rows, it don't change when rows is appended
+
+        The column chunks is shared, they are never changed after there is added.
+        get_row can be called on the copy from any thread (ex. ModelExporter).
+        """
+        model = ColumnarListModel(self.item_type, self.columns, self.item_factory)
+        model._chunks = list(self._chunks)
+        model._starts = list(self._starts)
+        model._n_items = self._n_items
+        return model
+
+    def append_columns(self, n_rows: int, columns: dict):
+        """ add a chunk of rows, as a dict of column name -> column data """
+        if not n_rows:
+            return
+        self._chunks.append(columns)
+        self._starts.append(self._n_items)
+        self._n_items += n_rows
+        self.items_changed(self._n_items - n_rows, 0, n_rows)
+
+
+class Ingestor:
+    """ Parse chunks of data in worker processes and append the rows to a ColumnarListModel
+
+    parse_func(chunk) must return a list of row tuples, with the values in the order of
+    the model columns. It runs in a worker process, so it must be a module level function.
+    If ordered is True, the chunks is added to the model in the order there are submitted.
+    The Ingestor owns the shared memory blocks of the results, until they are added to the model,
+    the blocks of results there is not added (after shutdown) is unlinked.
+    """
+
+    def __init__(self, model: ColumnarListModel, parse_func, max_workers=None, ordered=True):
+        self.model = model
+        self.parse_func = parse_func
+        self.ordered = ordered
+        self.rows = 0
+        self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        self._next_submit = 0
+        self._next_add = 0
+        self._done = {}
+        # submitted futures, there result is not read yet
+        self._futures = {}
+        self._lock = Lock()
+        self._closed = False
+
+    def submit(self, chunk):
+        """ parse a chunk in a worker process """
+        seq = self._next_submit
+        self._next_submit += 1
+        future = self._pool.submit(_parse_chunk, self.parse_func, self.model.columns, chunk)
+        self._futures[seq] = future
+        future.add_done_callback(lambda future: self._on_done(seq, future))
+        return future
+
+    @property
+    def pending(self):
+        return self._next_submit - self._next_add
+
+    def _on_done(self, seq, future):
+        # runs in a thread of the pool
+        with self._lock:
+            if not self._closed:
+                GLib.idle_add(self._on_parsed, seq, future)
+                return
+        self._free_result(future)
+
+    @staticmethod
+    def _free_result(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        _free(future.result()[0])
+
+    def _on_parsed(self, seq, future):
+        if self._closed:
+            return GLib.SOURCE_REMOVE
+        self._futures.pop(seq, None)
+        try:
+            name, n_rows = future.result()
+            columns = _read_columns(name, n_rows, self.model.columns)
+        except Exception as e:
+            print(f"Error parsing chunk {seq} : {e}")
+            n_rows, columns = 0, None
+        self._done[seq] = (n_rows, columns)
+        # add the chunks there is ready (in submit order if ordered)
+        ready = [self._next_add] if self.ordered else list(self._done)
+        while ready:
+            seq = ready.pop(0)
+            if seq not in self._done:
+                break
+            n_rows, columns = self._done.pop(seq)
+            self.model.append_columns(n_rows, columns)
+            self.rows += n_rows
+            self._next_add += 1
+            if self.ordered:
+                ready.append(self._next_add)
+        return GLib.SOURCE_REMOVE
+
+    def shutdown(self):
+        """ stop the workers, the results there is not added to the model is freed """
+        with self._lock:
+            self._closed = True
+            # the done results waiting for _on_parsed, the results done later is freed by _on_done
+            done = [future for future in self._futures.values() if future.done()]
+        self._futures.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for future in done:
+            self._free_result(future)
@@ -0,0 +1,257 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Instance & leak tracker for GObjects created through the widgets.py helpers
+
+TRACKER.install() counts the row elements (RowObject), the row widgets created by the
+list item factories and the dialogs & windows, as they are created & finalized
+(GObject weak reference notifications, so the count is right, even if the python wrapper is freed first).
+Other classes can be tracked with TRACKER.watch_class(cls).
+
+Used from the application, set EXAMPLE_LEAKS=1 and the growth is printed every 10 seconds.
+Run as a script, a window is opened and closed a number of times, and it exits
+with an error, if the live counts don't return to the baseline (the same check is run by test_leaks.py):
+
+usage: python3 leaks.py [cycles]
+"""
+import gc
+import os.path
+import sys
+import tempfile
+import threading
+import time
+from functools import wraps
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import GLib, Gtk
+
+import widgets
+
+
+class InstanceTracker:
+    """ Live counts of tracked GObjects by category """
+
+    def __init__(self):
+        self.created = {}
+        self.finalized = {}
+        # the GObject weak references must be kept, else the notification is removed
+        self._refs = {}
+        self._next_id = 0
+        # objects can be created & finalized in worker threads
+        self._lock = threading.Lock()
+        self._installed = False
+        self.history = []
+
+    def track(self, obj, category: str = None):
+        """ count obj as live, until it is finalized """
+        category = category or type(obj).__name__
+        with self._lock:
+            self.created[category] = self.created.get(category, 0) + 1
+            ref_id = self._next_id
+            self._next_id += 1
+            self._refs[ref_id] = (category, obj.weak_ref(self._on_finalized, ref_id))
+
+    def _on_finalized(self, ref_id):
+        with self._lock:
+            category, _ = self._refs.pop(ref_id)
+            self.finalized[category] = self.finalized.get(category, 0) + 1
+
+    def live(self) -> dict:
+        """ live objects by category """
+        with self._lock:
+            return {category: count - self.finalized.get(category, 0)
+                    for category, count in self.created.items()}
+
+    def live_objects(self, category: str) -> list:
+        """ the live objects in a category (to inspect a leak) """
+        with self._lock:
+            objects = [ref() for cat, ref in self._refs.values() if cat == category]
+        return [obj for obj in objects if obj is not None]
+
+    def growth(self, baseline: dict) -> dict:
+        """ categories with more live objects than in baseline """
+        result = {}
+        for category, count in self.live().items():
+            diff = count - baseline.get(category, 0)
+            if diff > 0:
+                result[category] = diff
+        return result
+
+    def report(self, baseline: dict = None, file=sys.stdout):
+        baseline = baseline or {}
+        print(f'{"category":<32}{"created":>9}{"finalized":>10}{"live":>7}{"growth":>8}', file=file)
+        for category, live in sorted(self.live().items()):
+            print(f'{category:<32}{self.created[category]:>9}{self.finalized.get(category, 0):>10}'
+                  f'{live:>7}{live - baseline.get(category, 0):>+8}', file=file)
+
+    def sample(self):
+        """ add the live counts to the history and print the categories there has grown since last sample """
+        live = self.live()
+        if self.history:
+            grown = self.growth(self.history[-1][1])
+            if grown:
+                print(f'live objects grown : {grown}')
+        self.history.append((time.monotonic(), live))
+        return GLib.SOURCE_CONTINUE
+
+    def watch_growth(self, interval=10):
+        """ sample the live counts every interval seconds """
+        self.sample()
+        return GLib.timeout_add_seconds(interval, self.sample)
+
+    # ------------------------------ instrumentation -------------------------------
+
+    def watch_class(self, cls, category: str = None):
+        """ track all new instances of cls (and subclasses) """
+        init = cls.__init__
+        tracker = self
+
+        @wraps(init)
+        def __init__(self, *args, **kwargs):
+            init(self, *args, **kwargs)
+            # only count it once, if more than one of its classes is watched
+            if not getattr(self, '_leak_tracked', False):
+                self._leak_tracked = True
+                tracker.track(self, category or type(self).__name__)
+
+        cls.__init__ = __init__
+
+    def watch_factory(self, view_cls):
+        """ track the row widgets created by the list item factory of a view class """
+        setup = view_cls.on_factory_setup
+        tracker = self
+
+        @wraps(setup)
+        def on_factory_setup(self, widget, item):
+            child = item.get_child()
+            setup(self, widget, item)
+            new_child = item.get_child()
+            if new_child is not None and new_child is not child and not getattr(new_child, '_leak_tracked', False):
+                new_child._leak_tracked = True
+                tracker.track(new_child, f'{type(new_child).__name__} row widget')
+
+        view_cls.on_factory_setup = on_factory_setup
+
+    def install(self):
+        """ track the row elements, row widgets, dialogs & windows of widgets.py """
+        if self._installed:
+            return
+        self._installed = True
+        self.watch_class(widgets.RowObject)
+        for view_cls in [widgets.ListViewBase, widgets.ViewColumnBase, widgets.GridViewBase,
+                         widgets.TreeListViewBase]:
+            self.watch_factory(view_cls)
+        for cls in [widgets.MaterialColorDialog, widgets.CommandPalette, widgets.Window]:
+            self.watch_class(cls)
+
+
+TRACKER = InstanceTracker()
+
+
+def settle(quiet=0.5, timeout=5.0):
+    """ run the main loop until there has been no events for quiet seconds (workers is done)
+    and collect garbage, so unused objects is finalized
+    """
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    last_event = time.monotonic()
+    while time.monotonic() < deadline:
+        if context.iteration(False):
+            last_event = time.monotonic()
+        elif time.monotonic() - last_event > quiet:
+            break
+        else:
+            time.sleep(0.01)
+    gc.collect()
+    # run the idle callbacks freeing objects there was part of reference cycles
+    while context.iteration(False):
+        pass
+
+
+def check_cycle(open_close, cycles=3, tracker=TRACKER) -> dict:
+    """ run open_close() a number of times, return the categories there has grown since the baseline
+
+    The first run is a warm up (caches, pools & lazy loaded objects), the baseline is taken after it.
+    The row widget pool is not cleared, so row widgets kept by the pool counts as growth,
+    the pool size is reported on its own line.
+    """
+    open_close()
+    settle()
+    baseline = tracker.live()
+    pool_size = len(widgets.ROW_POOL)
+    for _ in range(cycles):
+        open_close()
+    settle()
+    tracker.report(baseline)
+    print(f'{"row pool (widgets)":<32}{"":>9}{"":>10}{len(widgets.ROW_POOL):>7}'
+          f'{len(widgets.ROW_POOL) - pool_size:>+8}')
+    return tracker.growth(baseline)
+
+
+def assert_no_leaks(open_close, cycles=3, tracker=TRACKER):
+    """ fail (AssertionError), if the live counts don't return to the baseline after the cycles """
+    grown = check_cycle(open_close, cycles, tracker)
+    assert not grown, f'live objects has grown after {cycles} cycles : {grown}'
+
+
+def make_app():
+    """ Application for the leak checks, the state of the test windows is not saved in the user state """
+    # import the application after install, so its classes is patched too
+    from main import Application
+    app = Application()
+    app.register(None)
+    app.state = widgets.SessionState(os.path.join(tempfile.mkdtemp(), 'state.json'))
+    return app
+
+
+def window_cycle(app):
+    """ open a window, show all pages, open & close the color dialog and close the window """
+    from main import MyWindow
+    win = MyWindow("Leak Check", 800, 800, application=app)
+    win.present()
+    settle()
+    for page in win.stack.get_pages():
+        win.stack.set_visible_child(page.get_child())
+        settle()
+    win.on_button_chooser(None)
+    settle()
+    for dialog in Gtk.Window.list_toplevels():
+        if isinstance(dialog, widgets.MaterialColorDialog):
+            dialog.response(Gtk.ResponseType.CANCEL)
+    settle()
+    win.destroy()
+    settle()
+
+
+def main():
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    TRACKER.install()
+    app = make_app()
+    try:
+        assert_no_leaks(lambda: window_cycle(app), cycles)
+    except AssertionError as e:
+        print(f'FAILED : {e}')
+        return 1
+    print('OK : no growth in live objects')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,19 +18,32 @@
 
 """
 Sample Python Gtk4 Application
+
+Set EXAMPLE_STARTUP_REPORT=1 to get the import times and time to first window
+Set EXAMPLE_LEAKS=1 to track the live GObjects (see leaks.py)
 """
+import importlib
+import os
 import sys
+
+import startup
+
+if os.environ.get('EXAMPLE_STARTUP_REPORT') == '1':
+    startup.IMPORTS.install()
+
 import time
 from typing import List
 
 import gi
 
 gi.require_version("Gtk", "4.0")
-gi.require_version('Polkit', '1.0')
 
-from gi.repository import Gtk, Polkit, GObject, Gio
-from widgets import Window, Stack, MenuButton, get_font_markup, SearchBar, \
-    IconSelector, TextSelector, ListViewStrings, ListViewListStore, SwitchRow, ButtonRow, MaterialColorDialog, ColumnViewListStore
+from gi.repository import Gtk, GObject, Gio, GLib
+from widgets import Window, Stack, MenuButton, set_styled_text, SearchBar, \
+    IconSelector, TextSelector, ListViewStrings, ListViewListStore, MaterialColorDialog, \
+    ColumnViewListStore, ActionEntry, ActionRegistry, load_resources, \
+    StatusSink, ICONS, SessionState, FactoryMetrics, RowObject, \
+    ListViewPaged, DropDown, TemplatePage, TemplateChild, ui_template, install_css, load_builder
 
 
 def get_permision(action_id='org.freedesktop.accounts.user-administration'):
@@ -38,57 +51,89 @@ def get_permision(action_id='org.freedesktop.accounts.user-administration'):
     Get an GPermission object from PolKit to use with Gtk.LockButton
     @param action_id: is just an example there exist on at Fedora 34 workstation
     """
+    # Polkit is only loaded when it is used
+    gi.require_version('Polkit', '1.0')
+    from gi.repository import Polkit
     prem = Polkit.Permission.new_sync(action_id, None, None)
     # print(prem.acquire())
     return prem
 
 
-# Gtk.Builder xml for the application menu
-APP_MENU = """
-<?xml version="1.0" encoding="UTF-8"?>
-<interface>
-<menu id='app-menu'>
-  <section>
-    <item>
-      <attribute name='label' translatable='yes'>_New Stuff</attribute>
-      <attribute name='action'>win.new</attribute>
-    </item>
-    <item>
-      <attribute name='label' translatable='yes'>_About</attribute>
-      <attribute name='action'>win.about</attribute>
-    </item>
-    <item>
-      <attribute name='label' translatable='yes'>_Shortcuts</attribute>
-      <attribute name='action'>win.shortcuts</attribute>
-    </item>
-    <item>
-      <attribute name='label' translatable='yes'>_Quit</attribute>
-      <attribute name='action'>win.quit</attribute>
-    </item>
-  </section>
-</menu>
-</interface>
-"""
-
-
-class ColumnElem(GObject.GObject):
+def get_permision_async(callback, action_id='org.freedesktop.accounts.user-administration'):
+    """
+    Get an GPermission object from PolKit, without blocking, callback(permission) is called when it is ready
+    """
+    gi.require_version('Polkit', '1.0')
+    from gi.repository import Polkit
+
+    def on_ready(source, result):
+        try:
+            callback(Polkit.Permission.new_finish(result))
+        except GLib.Error as e:
+            print(f"Error getting permission : {e} ")
+
+    Polkit.Permission.new(action_id, None, None, on_ready)
+
+
+# Style used for the status labels on the pages
+STATUS_STYLE = {'font': 'Noto Sans Regular 14', 'color': '#BF360C', 'weight': 'bold'}
+
+# Window & widget state saved between sessions
+STATE_FILE = os.path.join(GLib.get_user_config_dir(), 'gtk4-python-example', 'state.json')
+
+# Icons used in the application, there is looked up in the background after startup
+APP_ICONS = ['dialog-information-symbolic', 'software-update-available-symbolic', 'drive-multidisk-symbolic',
+             'insert-object-symbolic', 'open-menu-symbolic', 'preferences-other-symbolic']
+
+# Compiled bundle with main.css & the page templates (build it with build_resources.py)
+RESOURCE_FILE = 'example.gresource'
+# use the resource bundle, if it has been build (before the page templates is loaded by their classes)
+load_resources(RESOURCE_FILE)
+
+# Actions used by the application menu, the callbacks are methods in MyWindow
+APP_ACTIONS = ActionRegistry([
+    ActionEntry('new', 'menu_handler', ['<Ctrl>n'], label='_New Stuff'),
+    ActionEntry('about', 'menu_handler', label='_About'),
+    ActionEntry('export', 'menu_handler', ['<Ctrl>e'], label='_Export List'),
+    ActionEntry('shortcuts', 'menu_handler', ['<Ctrl>question'], label='_Shortcuts'),
+    ActionEntry('quit', 'menu_handler', ['<Ctrl>q'], label='_Quit'),
+    ActionEntry('debug', 'menu_handler', ['<Ctrl><Shift>d'], label='_Debug Page', group='Debug'),
+])
+
+APP_ID = 'dk.rasmil.Example'
+# Application actions, used by the running instance
+APP_SERVICE_ACTIONS = ActionRegistry([
+    ActionEntry('new-window', 'on_app_action', ['<Ctrl><Shift>n'], label='New _Window'),
+    ActionEntry('quit', 'on_app_action', label='_Quit'),
+], prefix='app')
+
+# Collect list factory metrics from startup, show the debug page & dump them on exit
+DEBUG = os.environ.get('EXAMPLE_DEBUG') == '1'
+# Track the live GObjects, print the growth every 10 seconds & a report on exit (see leaks.py)
+LEAKS = os.environ.get('EXAMPLE_LEAKS') == '1'
+METRICS_FILE = os.path.join(GLib.get_user_cache_dir(), 'gtk4-python-example', 'metrics.json')
+
+
+class ColumnElem(RowObject):
     """ custom data element for a ColumnView model (Must be based on GObject) """
+    name = GObject.Property(type=str, default='')
 
     def __init__(self, name: str):
-        super(ColumnElem, self).__init__()
-        self.name = name
+        super(ColumnElem, self).__init__(name=name)
 
     def __repr__(self):
         return f'ColumnElem(name: {self.name})'
 
 
-class ListElem(GObject.GObject):
-    """ custom data element for a ListView model (Must be based on GObject) """
+class ListElem(RowObject):
+    """ custom data element for a ListView model (Must be based on GObject)
+    the values is GObject properties, so the view is updated when they change
+    """
+    name = GObject.Property(type=str, default='')
+    state = GObject.Property(type=bool, default=False)
 
     def __init__(self, name: str, state: bool):
-        super(ListElem, self).__init__()
-        self.name = name
-        self.state = state
+        super(ListElem, self).__init__(name=name, state=state)
 
     def __repr__(self):
         return f'ListElem(name: {self.name} state: {self.state})'
@@ -96,6 +141,8 @@ class ListElem(GObject.GObject):
 
 class MyListViewStrings(ListViewStrings):
     """ Custom ListView """
+    # same row widgets as MyColumnViewColumn, so they can share recycled labels
+    row_template = 'label'
 
     def __init__(self, win: Gtk.ApplicationWindow):
         # Init ListView with store model class.
@@ -131,15 +178,20 @@ class MyListViewStrings(ListViewStrings):
         # Update Gtk.Switch with data from model item
         item.set_child(label)
 
+    def factory_reset(self, child: Gtk.Widget):
+        """ clear the label before it goes back to the row pool """
+        child.set_text('')
+
     def selection_changed(self, widget, ndx: int):
         """ trigged when selecting in listview is changed"""
-        markup = self.win._get_text_markup(
-            f'Row {ndx} was selected ( {self.store[ndx].get_string()} )')
-        self.win.page4_label.set_markup(markup)
+        self.win.set_status(self.win.page4_label,
+                            f'Row {ndx} was selected ( {self.store[ndx].get_string()} )')
 
 
 class MyListView(ListViewListStore):
     """ Custom ListView """
+    row_template = 'label-switch'
+    watch_properties = ('name', 'state')
 
     def __init__(self, win: Gtk.ApplicationWindow):
         # Init ListView with store model class.
@@ -188,34 +240,51 @@ class MyListView(ListViewListStore):
         # Update Gtk.Switch with data from model item
         switch.set_state(data.state)
         # connect switch to handler, so we can handle changes
-        switch.connect('state-set', self.switch_changed, item.get_position())
+        switch.handler_id = switch.connect('state-set', self.switch_changed, item.get_position())
         item.set_child(box)
 
     def factory_unbind(self, widget: Gtk.ListView, item: Gtk.ListItem):
         """ Gtk.SignalListItemFactory::unbind signal callback (overloaded from parent class) """
-        pass
+        # disconnect the switch handler, so it is not connected again on next bind
+        switch = item.get_child().get_last_child()
+        if getattr(switch, 'handler_id', None):
+            switch.disconnect(switch.handler_id)
+            switch.handler_id = None
 
     def factory_teardown(self, widget: Gtk.ListView, item: Gtk.ListItem):
         """ Gtk.SignalListItemFactory::teardown signal callback (overloaded from parent class """
         pass
 
+    def factory_update(self, widget: Gtk.ListView, item: Gtk.ListItem, name: str):
+        """ update the widget showing a changed property of the item """
+        data = item.get_item()
+        label = item.get_child().get_first_child()
+        if name == 'name':
+            label.set_text(data.name)
+        else:
+            label.get_next_sibling().set_state(data.state)
+
+    def factory_reset(self, child: Gtk.Widget):
+        """ clear the row widgets before they go back to the row pool """
+        label = child.get_first_child()
+        label.set_text('')
+        label.get_next_sibling().set_state(False)
+
     def selection_changed(self, widget, ndx: int):
         """ trigged when selecting in listview is changed"""
-        markup = self.win._get_text_markup(
-            f'Row {ndx} was selected ( {self.store[ndx]} )')
-        self.win.page4_label.set_markup(markup)
+        self.win.set_status(self.win.page4_label, f'Row {ndx} was selected ( {self.store[ndx]} )')
 
     def switch_changed(self, widget, state: bool, pos: int):
-        # update the data model, with current state
+        # update the data model, with current state (it updates other views of the element too)
         elem = self.store[pos]
         elem.state = state
-        markup = self.win._get_text_markup(
-            f'switch in row {pos}, changed to {state}')
-        self.win.page4_label.set_markup(markup)
+        self.win.set_status(self.win.page4_label, f'switch in row {pos}, changed to {state}')
 
 
 class MyColumnViewColumn (ColumnViewListStore):
     """ Custom ColumnViewColumn """
+    row_template = 'label'
+    watch_properties = ('name',)
 
     def __init__(self, win: Gtk.ApplicationWindow, col_view: Gtk.ColumnView, data: List):
         # Init ListView with store model class.
@@ -243,28 +312,210 @@ class MyColumnViewColumn (ColumnViewListStore):
         data = item.get_item()    # get the model item, connected to current ListItem
         label.set_text(data.name)  # Update Gtk.Label with data from model item
 
+    def factory_reset(self, child: Gtk.Widget):
+        """ clear the label before it goes back to the row pool """
+        child.set_text('')
+
+    def selection_changed(self, widget, ndx: int):
+        """ trigged when selecting in listview is changed"""
+        self.win.set_status(self.win.page4_label, f'Row {ndx} was selected ( {self.store[ndx]} )')
+
+
+def fetch_results(offset: int, limit: int) -> list:
+    """ example of a slow paged data source (ex. a search on a server), there is 10000 results """
+    time.sleep(0.3)
+    return [ColumnElem(f'Result {ndx}') for ndx in range(offset, min(offset + limit, 10000))]
+
+
+class MyPagedListView(ListViewPaged):
+    """ Custom ListView, with infinite scrolling """
+    row_template = 'label'
+    page_size = 50
+    max_pages = 20
+
+    def __init__(self, win: Gtk.ApplicationWindow):
+        super(MyPagedListView, self).__init__(ColumnElem, fetch_results)
+        self.win = win
+
+    def factory_setup(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        """ Gtk.SignalListItemFactory::setup signal callback (overloaded from parent class) """
+        label = Gtk.Label()
+        label.set_halign(Gtk.Align.START)
+        label.set_hexpand(True)
+        label.set_margin_start(10)
+        item.set_child(label)
+
+    def factory_bind(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        """ Gtk.SignalListItemFactory::bind signal callback (overloaded from parent class) """
+        self.get_row_widget(item).set_text(item.get_item().name)
+
+    def factory_unbind(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        pass
+
+    def factory_teardown(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        pass
+
+    def factory_reset(self, child: Gtk.Widget):
+        """ clear the label before it goes back to the row pool """
+        child.set_text('')
+
     def selection_changed(self, widget, ndx: int):
         """ trigged when selecting in listview is changed"""
-        markup = self.win._get_text_markup(
-            f'Row {ndx} was selected ( {self.store[ndx]} )')
-        self.win.page4_label.set_markup(markup)
+        self.win.set_status(self.win.page5_label, f'Row {ndx} was selected ( {self.store[ndx]} )')
+
+
+@ui_template('page1.ui')
+class PageOne(TemplatePage):
+    """ Page with a icon selector, buttons, an entry, a calendar & dropdowns """
+    __gtype_name__ = 'ExamplePageOne'
+    exports = ('page1_label',)
+    content = TemplateChild(Gtk.Box)
+    page1_label = TemplateChild(Gtk.Label)
+    lock_btn = TemplateChild(Gtk.LockButton)
+
+    def __init__(self, win):
+        super(PageOne, self).__init__(win)
+        selector = IconSelector()
+        selector.add_row("row1", "dialog-information-symbolic")
+        selector.add_row("row2", "software-update-available-symbolic")
+        selector.add_row("row3", "drive-multidisk-symbolic")
+        selector.add_row("row4", "insert-object-symbolic")
+        selector.set_callback(win.on_select_icon_selector)
+        self.prepend(selector)
+        # the lock button permission is set, when the main loop is idle
+        GLib.idle_add(win._load_permission, self.lock_btn)
+        # DropDown with search, the 100000 options is loaded, when the application is idle
+        dropdown = DropDown((f'Option {ndx:06d}' for ndx in range(100000)))
+        dropdown.set_margin_top(20)
+        dropdown.set_margin_start(20)
+        dropdown.set_size_request(200, -1)
+        dropdown.set_halign(Gtk.Align.START)
+        dropdown.set_callback(lambda ndx: win.set_status(self.page1_label, f'Option {ndx} was selected'))
+        self.content.append(dropdown)
+
+    @Gtk.Template.Callback()
+    def on_button_clicked(self, widget):
+        self.win.on_button_clicked(widget)
+
+    @Gtk.Template.Callback()
+    def on_entry_activate(self, widget):
+        self.win.on_entry_activate(widget)
+
+    @Gtk.Template.Callback()
+    def on_calendar_changed(self, widget):
+        self.win.on_calendar_changed(widget)
+
+
+@ui_template('page2.ui')
+class PageTwo(TemplatePage):
+    """ Page with a text selector and a text view with an overlay """
+    __gtype_name__ = 'ExamplePageTwo'
+    exports = ('page2_label', 'overlay_info')
+    page2_label = TemplateChild(Gtk.Label)
+    overlay_info = TemplateChild(Gtk.InfoBar)
+    text_view = TemplateChild(Gtk.TextView)
+
+    def __init__(self, win):
+        super(PageTwo, self).__init__(win)
+        selector = TextSelector()
+        selector.add_row("Orange", "Orange")
+        selector.add_row("Apple", "Apple")
+        selector.add_row("Water Melon", "Water Melon")
+        selector.add_row("Lollypop", "Lollypop")
+        selector.set_callback(win.on_select_text_selector)
+        self.prepend(selector)
+        txt = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. Cras vitae leo ac magna lobortis maximus. ' \
+              'Etiam eleifend, libero a pulvinar ornare, justo nunc porta velit, ut sodales mi est feugiat tellus. '
+        self.text_view.get_buffer().set_text(txt * 10)
+
+    @Gtk.Template.Callback()
+    def on_switch_overlay(self, widget, state):
+        return self.win.on_switch_overlay(widget, state)
+
+
+@ui_template('page3.ui')
+class PageThree(TemplatePage):
+    """ Page with css styled content, main.css is added to the display in Application.do_startup """
+    __gtype_name__ = 'ExamplePageThree'
+    exports = ('left_right_paned', 'top_botton_paned', 'bottom_box', 'revealer', 'page3_label')
+    frame = TemplateChild(Gtk.Frame)
+    left_right_paned = TemplateChild(Gtk.Paned)
+    top_botton_paned = TemplateChild(Gtk.Paned)
+    bottom_box = TemplateChild(Gtk.Box)
+    revealer = TemplateChild(Gtk.Revealer)
+    page3_label = TemplateChild(Gtk.Label)
+
+    def __init__(self, win):
+        super(PageThree, self).__init__(win)
+        # the selectors in main.css only match the widgets inside the custom-styling class
+        self.frame.add_css_class('custom-styling')
+
+    @Gtk.Template.Callback()
+    def on_switch_activate(self, widget, state):
+        return self.win.on_switch_activate(widget, state)
+
+
+@ui_template('page4.ui')
+class PageFour(TemplatePage):
+    """ Page with a column view & list views """
+    __gtype_name__ = 'ExamplePageFour'
+    exports = ('page4_label', 'columnview', 'listview', 'listview_str')
+    page4_label = TemplateChild(Gtk.Label)
+    columnview = TemplateChild(Gtk.ColumnView)
+    listview_sw = TemplateChild(Gtk.ScrolledWindow)
+    listview_str_sw = TemplateChild(Gtk.ScrolledWindow)
+
+    def __init__(self, win):
+        super(PageFour, self).__init__(win)
+        data = [f'Data Row: {row}' for row in range(50)]
+        for i in range(4):
+            column = MyColumnViewColumn(win, self.columnview, data)
+            column.set_title(f"Column {i}")
+            self.columnview.append_column(column)
+        # Listview with switches
+        self.listview = MyListView(win)
+        self.listview_sw.set_child(self.listview)
+        # Simple Listview with strings
+        self.listview_str = MyListViewStrings(win)
+        self.listview_str_sw.set_child(self.listview_str)
+
+
+@ui_template('page5.ui')
+class PageFive(TemplatePage):
+    """ Page with a Material Color button & a list view with infinite scrolling """
+    __gtype_name__ = 'ExamplePageFive'
+    exports = ('page5_label', 'listview_paged')
+    page5_label = TemplateChild(Gtk.Label)
+    listview_paged_sw = TemplateChild(Gtk.ScrolledWindow)
+
+    def __init__(self, win):
+        super(PageFive, self).__init__(win)
+        self.listview_paged = MyPagedListView(win)
+        self.listview_paged_sw.set_child(self.listview_paged)
+
+    @Gtk.Template.Callback()
+    def on_button_chooser(self, widget):
+        self.win.on_button_chooser(widget)
 
 
 class MyWindow(Window):
+    # the startup report is shown for the first window
+    startup_reported = False
 
     def __init__(self, title, width, height, **kwargs):
         super(MyWindow, self).__init__(title, height, width, **kwargs)
-        # load the custom css, so we can use it later
-        self.load_css('main.css')
         self.revealer = None
+        self.export_dialog = None
+        # status label updates, applied once per frame
+        self._status_sinks = {}
+        # look up the application icons, when there is time for it
+        ICONS.prefetch(APP_ICONS)
         # Add Menu Button to the titlebar (Right Side)
-        menu = MenuButton(APP_MENU, 'app-menu')
+        # the menu is build from the labels of APP_ACTIONS, the first time it is opened
+        menu = MenuButton(APP_ACTIONS.get_menu, 'app-menu')
         self.headerbar.pack_end(menu)
         # Create actions to handle menu actions
-        self.create_action('new', self.menu_handler)
-        self.create_action('about', self.menu_handler)
-        self.create_action('quit', self.menu_handler)
-        self.create_action('shortcuts', self.menu_handler)
+        self.add_actions(APP_ACTIONS)
 
         # make a new title label and add it to the left.
         # So we kan place the stack switcher in the middle
@@ -285,385 +536,96 @@ class MyWindow(Window):
         # Stack
         self.stack = Stack()
 
-        # Stack Page 1
-        self.page1 = self.setup_page_one('page1', 'Page 1')
-        # Stack Page 2
-        self.page2 = self.setup_page_two('page2', 'Page 2')
-        # Stack Page 3
-        self.page3 = self.setup_page_three('page3', 'Page 3')
-        # Stack Page 4
-        self.page4 = self.setup_page_four('page4', 'Page 4')
-        # Stack Page 5
-        self.page5 = self.setup_page_five('page5', 'Page 5')
+        # Stack Pages, build from page1.ui ... page5.ui
+        self.page1 = self.add_template_page(self.stack, 'page1', 'Page 1', PageOne)
+        self.page2 = self.add_template_page(self.stack, 'page2', 'Page 2', PageTwo)
+        self.page3 = self.add_template_page(self.stack, 'page3', 'Page 3', PageThree)
+        self.page4 = self.add_template_page(self.stack, 'page4', 'Page 4', PageFour)
+        self.page5 = self.add_template_page(self.stack, 'page5', 'Page 5', PageFive)
         # add stack switcher to center of titlebar
         self.headerbar.set_title_widget(self.stack.switcher)
         # Add stack to window
         content.append(self.stack)
         # Add main content box to window
         self.set_child(content)
+        self.debug_page = None
+        if DEBUG:
+            self.show_debug_page()
+        # Command palette (Ctrl+P), searching actions, pages & the string list
+        self.add_command_palette()
+        self.add_stack_commands(self.stack)
+        self.add_list_commands('strings', self.listview_str, lambda elem: elem.get_string())
+        # restore the state from last session, before the window is shown
+        self.track_state(self.get_application().state)
+        # only the first window is reported, later windows is opened by resident & remote activation
+        if os.environ.get('EXAMPLE_STARTUP_REPORT') == '1' and not MyWindow.startup_reported:
+            MyWindow.startup_reported = True
+            startup.report_first_window(self)
+
+    def track_state(self, state: SessionState):
+        """ restore & save the window state """
+        state.track_window(self)
+        state.track_stack(self.stack)
+        state.track_paned(self.left_right_paned, 'left_right_paned')
+        state.track_paned(self.top_botton_paned, 'top_botton_paned')
+        state.track_list(self.listview, 'listview')
+        state.track_list(self.listview_str, 'listview_str')
+
+    def show_debug_page(self):
+        """ add the debug page with list factory metrics (collected from now, if not enabled at startup) """
+        if self.debug_page is None:
+            for view in [self.listview, self.listview_str] + list(self.columnview.get_columns()):
+                if view.metrics is None:
+                    view.enable_metrics()
+            self.debug_page = self.add_debug_page(self.stack)
+        self.stack.set_visible_child_name('debug')
+
+    def _load_permission(self, lock_btn):
+        get_permision_async(lock_btn.set_permission)
+        return GLib.SOURCE_REMOVE
+
+    def set_status(self, label: Gtk.Label, txt: str):
+        """ show a status text in one of the page labels
+
+        Can be called from any thread, only the latest text is shown in the next frame
+        """
+        sink = self._status_sinks.get(label)
+        if sink is None:
+            sink = StatusSink(label, self._show_status)
+            self._status_sinks[label] = sink
+        sink.update(label, txt)
+
+    def _show_status(self, label: Gtk.Label, txt: str):
+        set_styled_text(label, txt, **STATUS_STYLE)
+
+    def open_file(self, file: Gio.File):
+        """ show a file given on the command line or opened by another instance """
+        name = file.get_basename()
+        self.set_title(f'{name} - {self.get_title()}')
+        self.set_status(self.page1_label, f'{file.get_parse_name()} was opened')
+
+    def show_export_dialog(self):
+        """ select a file and export the list with switches (page 4) to it """
+        dialog = Gtk.FileChooserNative.new('Export List', self, Gtk.FileChooserAction.SAVE, '_Export', '_Cancel')
+        dialog.set_current_name('list.csv')
+        dialog.connect('response', self.on_export_response)
+        # keep a reference, until the dialog is closed
+        self.export_dialog = dialog
+        dialog.show()
 
-    def setup_page_header(self, name, title):
-        """ setup the common widgets for each page """
-        # Content box for the page
-        frame = Gtk.Frame()
-        # Set Frame Margins
-        frame.set_margin_top(15)
-        frame.set_margin_start(15)
-        frame.set_margin_end(15)
-        frame.set_margin_bottom(15)
-        # Content box for the page
-        content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        # Add a label with custom font in the center
-        label = Gtk.Label()
-        label.set_margin_top(20)
-        markup = get_font_markup('Noto Sans Regular 20', f'This is {title}')
-        label.set_markup(markup)
-        label.set_valign(Gtk.Align.CENTER)
-        content.append(label)
-        # Output label to write user action on the page
-        label = Gtk.Label()
-        label.set_margin_top(20)
-        label.set_margin_start(20)
-        label.set_hexpand(True)
-        label.set_halign(Gtk.Align.CENTER)
-        label.set_xalign(0.0)
-        content.append(label)
-        frame.set_child(content)
-        return frame, content, label
-
-    def setup_page_one(self, name, title):
-        """ Add a page with a icon selector to the stack"""
-        # Main Content box for the page
-        main = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        # Add info selector
-        selector = IconSelector()
-        selector.add_row("row1", "dialog-information-symbolic")
-        selector.add_row("row2", "software-update-available-symbolic")
-        selector.add_row("row3", "drive-multidisk-symbolic")
-        selector.add_row("row4", "insert-object-symbolic")
-        selector.set_callback(self.on_select_icon_selector)
-        main.append(selector)
-        page_frame, content_right, lbl = self.setup_page_header(name, title)
-        self.page1_label = lbl
-        # Lock button
-        lock_btn = Gtk.LockButton.new(get_permision())
-        lock_btn.set_margin_top(20)
-        lock_btn.set_halign(Gtk.Align.CENTER)
-        lock_btn.set_hexpand(False)
-        content_right.append(lock_btn)
-        # buttoms
-        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        box.set_halign(Gtk.Align.CENTER)
-        box.set_margin_top(20)
-        box.set_spacing(10)
-        for x in range(5):
-            btn = Gtk.Button()
-            btn.set_label(f'Button {x}')
-            btn.connect('clicked', self.on_button_clicked)
-            box.append(btn)
-        content_right.append(box)
-        # Entry
-        entry = Gtk.Entry()
-        entry.set_halign(Gtk.Align.FILL)
-        entry.set_valign(Gtk.Align.END)
-        entry.set_margin_top(20)
-        entry.set_margin_start(20)
-        entry.set_margin_end(20)
-        entry.set_placeholder_text("Type something here ....")
-        entry.connect('activate', self.on_entry_activate)
-        content_right.append(entry)
-        # Calendar
-        calendar = Gtk.Calendar()
-        calendar.set_margin_top(20)
-        calendar.set_halign(Gtk.Align.CENTER)
-        calendar.connect('day-selected', self.on_calendar_changed)
-        content_right.append(calendar)
-        # DropDown
-        model = Gtk.StringList()
-        for txt in ['One', 'Two', 'Three', 'Four']:
-            model.append(txt)
-        dropdown = Gtk.DropDown.new(model)
-        dropdown.set_margin_top(20)
-        dropdown.set_margin_start(20)
-        dropdown.set_size_request(200, -1)
-        dropdown.set_halign(Gtk.Align.START)
-        content_right.append(dropdown)
-        # DropDown
-        dropdown = Gtk.DropDown.new_from_strings(
-            ['Red', 'Green', 'Blue', 'Black', 'White'])
-        dropdown.set_margin_top(20)
-        dropdown.set_margin_start(20)
-        dropdown.set_size_request(200, -1)
-        dropdown.set_halign(Gtk.Align.START)
-        content_right.append(dropdown)
-        main.append(page_frame)
-        # Add the content box as a new page in the stack
-        return self.stack.add_page(name, title, main)
-
-    def setup_page_two(self, name, title):
-        """ Add a page with a text selector to the stack"""
-        # Content box for the page
-        main = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        # Add info selector
-        selector = TextSelector()
-        selector.add_row("Orange", "Orange")
-        selector.add_row("Apple", "Apple")
-        selector.add_row("Water Melon", "Water Melon")
-        selector.add_row("Lollypop", "Lollypop")
-        selector.set_callback(self.on_select_text_selector)
-        main.append(selector)
-        # Add a label with custom font in the center
-        frame, content_right, label = self.setup_page_header(name, title)
-        self.page2_label = label
-        # Overlay
-        overlay_info = Gtk.InfoBar()
-        overlay_info.set_halign(Gtk.Align.FILL)
-        overlay_info.set_valign(Gtk.Align.START)
-        overlay_info.set_margin_top(10)
-        overlay_info.set_margin_start(10)
-        overlay_info.set_margin_end(10)
-        lbl = Gtk.Label()
-        lbl.set_halign(Gtk.Align.FILL)
-        lbl.set_valign(Gtk.Align.FILL)
-        lbl.set_hexpand(True)
-        lbl.set_vexpand(True)
-        lbl.set_markup(
-            '<span foreground="#ff0000" size="xx-large">This is an Gtk.Infobar as an overlay</span>')
-        overlay_info.add_child(lbl)
-        self.overlay_info = overlay_info
-        frame_child = Gtk.Frame()
-        # TexkView
-        sw = Gtk.ScrolledWindow()
-        text = Gtk.TextView.new()
-        text.set_vexpand(True)
-        # Set Wrap Mode to word
-        text.set_wrap_mode(Gtk.WrapMode.WORD)
-        # Add some text
-        txt = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. Cras vitae leo ac magna lobortis maximus. ' \
-              'Etiam eleifend, libero a pulvinar ornare, justo nunc porta velit, ut sodales mi est feugiat tellus. '
-        text.get_buffer().set_text(txt * 10)
-        sw.set_child(text)
-        frame_child.set_child(sw)
-        overlay = Gtk.Overlay()
-        overlay.set_margin_top(20)
-        overlay.set_margin_start(20)
-        overlay.set_margin_end(20)
-        overlay.set_margin_bottom(20)
-        overlay.set_child(frame_child)
-        overlay.add_overlay(overlay_info)
-        content_right.append(overlay)
-        # Switch to control overlay visibility
-        switch_row = SwitchRow("Show Overlay")
-        switch_row.set_state(True)
-        switch_row.connect('state-set', self.on_switch_overlay)
-        content_right.append(switch_row)
-        main.append(frame)
-        # Add the content box as a new page in the stack
-        return self.stack.add_page(name, title, main)
-
-    def setup_page_three(self, name, title):
-        """ Add a page with css styled content to the stack"""
-        # Content box for the page
-
-        frame = Gtk.Frame()
-        # Set Frame Margins
-        frame.set_margin_top(15)
-        frame.set_margin_start(15)
-        frame.set_margin_end(15)
-        frame.set_margin_bottom(15)
-
-        # Left/Right Paned
-        # Orientation is the ways the separator is moving, not the way it is facing
-        # So HORIZONTAL split in Left/Right and VERTICAL split in Top/Down
-        self.left_right_paned = Gtk.Paned(
-            orientation=Gtk.Orientation.HORIZONTAL)
-        # Left Side
-        left_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        left_box.set_vexpand(True)
-        left_box.set_spacing(5)
-        left_label = Gtk.Label.new("LEFT")
-        left_label.set_valign(Gtk.Align.START)
-        left_label.set_halign(Gtk.Align.START)
-        left_box.append(left_label)
-        # Add Progress Bar
-        progress = Gtk.ProgressBar()
-        progress.set_fraction(.75)
-        left_box.append(progress)
-        # Add Scale
-        scale = Gtk.Scale.new_with_range(Gtk.Orientation.HORIZONTAL, 0, 100, 5)
-        scale.set_value(25)
-        left_box.append(scale)
-        # sepatator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL)
-        left_box.append(separator)
-        self.left_right_paned.set_start_child(left_box)
-        self.left_right_paned.set_shrink_start_child(False)  # Can't shrink
-        # Right Side
-        right_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        right_label = Gtk.Label.new("RIGHT")
-        right_label.set_valign(Gtk.Align.START)
-        right_label.set_halign(Gtk.Align.START)
-        right_box.append(right_label)
-        # TexkView
-        text = Gtk.TextView.new()
-        # Set the default width
-        text.set_size_request(150, -1)
-        # Set Wrap Mode to word
-        text.set_wrap_mode(Gtk.WrapMode.WORD)
-        # Add some text
-        txt = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. Cras vitae leo ac magna lobortis maximus. ' \
-              'Etiam eleifend, libero a pulvinar ornare, justo nunc porta velit, ut sodales mi est feugiat tellus. '
-        text.get_buffer().set_text(txt)
-        right_box.append(text)
-        # Add Switches
-        for txt in ['Reveal', 'Yet Another Option']:
-            grid = Gtk.Grid()
-            grid.set_column_spacing(30)
-            grid.insert_row(0)
-            grid.insert_column(0)
-            grid.insert_column(1)
-            grid.insert_column(2)
-            grid.set_row_homogeneous(True)
-            label = Gtk.Label.new(txt)
-            label.set_hexpand(True)
-            label.set_xalign(0.0)
-            label.set_valign(Gtk.Align.CENTER)
-            switch = Gtk.Switch()
-            if txt == "Reveal":
-                switch.connect('state-set', self.on_switch_activate)
-                switch.set_state(True)
-            grid.attach(label, 0, 1, 2, 1)
-            grid.attach(switch, 2, 1, 1, 1)
-            right_box.append(grid)
-        # Some bottoms
-        lock_btn = Gtk.LockButton.new()
-        right_box.append(lock_btn)
-        # Add the box to paned
-        self.left_right_paned.set_end_child(right_box)
-        self.left_right_paned.set_shrink_end_child(False)  # Can't shrink
-        # Top/Down Paned
-        self.top_botton_paned = Gtk.Paned(orientation=Gtk.Orientation.VERTICAL)
-        # Top
-        self.top_botton_paned.set_start_child(self.left_right_paned)
-        self.top_botton_paned.set_shrink_start_child(False)
-        # Bottom
-        self.bottom_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.bottom_box.set_vexpand(False)
-        # Add a label with custom font in the center
-        label = Gtk.Label()
-        markup = get_font_markup(
-            'Noto Sans Regular 24', f'This page is styled using main.css')
-        label.set_markup(markup)
-        # fill the whole page, will make the Label centered.
-        label.set_halign(Gtk.Align.CENTER)
-        label.set_vexpand(False)
-        self.bottom_box.append(label)
-        label = Gtk.Label()
-        markup = get_font_markup(
-            'Noto Sans Regular 18', f'UGLY AS HELL, but shows how it is working')
-        label.set_markup(markup)
-        # fill the whole page, will make the Label centered.
-        label.set_halign(Gtk.Align.CENTER)
-        label.set_vexpand(False)
-        self.bottom_box.append(label)
-        # Revealer
-        self.revealer = Gtk.Revealer()
-        self.revealer.set_valign(Gtk.Align.END)
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        label = Gtk.Label.new("This is a revlealer")
-        box.append(label)
-        self.revealer.set_child(box)
-        self.revealer.set_transition_type(Gtk.RevealerTransitionType.CROSSFADE)
-        self.revealer.set_transition_duration(200)
-        self.revealer.set_reveal_child(True)
-        self.bottom_box.append(self.revealer)
-        self.top_botton_paned.set_end_child(self.bottom_box)
-        self.top_botton_paned.set_shrink_end_child(False)  # Can't shrink
-        frame.set_child(self.top_botton_paned)
-        self.page3_label = label
-        # add custom styling to widgets
-        self.add_custom_styling(frame)
-        # Add the content box as a new page in the stack
-        return self.stack.add_page(name, title, frame)
-
-    def setup_page_four(self, name, title):
-        """ Add a page with a text selector to the stack"""
-        # Content box for the page
-        frame, content, label = self.setup_page_header(name, title)
-        self.page4_label = label
-
-        # ColumnView with custom columns
-        self.columnview = Gtk.ColumnView()
-        self.columnview.set_show_column_separators(True)
-        data = [f'Data Row: {row}' for row in range(50)]
-        for i in range(4):
-            column = MyColumnViewColumn(self, self.columnview, data)
-            column.set_title(f"Column {i}")
-            self.columnview.append_column(column)
-        lw_frame = Gtk.Frame()
-        lw_frame.set_valign(Gtk.Align.FILL)
-        lw_frame.set_vexpand(True)
-        lw_frame.set_margin_start(20)
-        lw_frame.set_margin_end(20)
-        lw_frame.set_margin_top(10)
-        lw_frame.set_margin_bottom(10)
-        sw = Gtk.ScrolledWindow()
-        sw.set_child(self.columnview)
-        lw_frame.set_child(sw)
-        content.append(lw_frame)
-
-        # Listview with switches
-        self.listview = MyListView(self)
-        lw_frame = Gtk.Frame()
-        lw_frame.set_valign(Gtk.Align.FILL)
-        lw_frame.set_vexpand(True)
-        lw_frame.set_margin_start(20)
-        lw_frame.set_margin_end(20)
-        # lw_frame.set_margin_top(10)
-        lw_frame.set_margin_bottom(10)
-        sw = Gtk.ScrolledWindow()
-        sw.set_child(self.listview)
-        lw_frame.set_child(sw)
-        content.append(lw_frame)
-        # Simple Listview with strings
-        self.listview_str = MyListViewStrings(self)
-        lw_frame = Gtk.Frame()
-        lw_frame.set_valign(Gtk.Align.FILL)
-        lw_frame.set_vexpand(True)
-        lw_frame.set_margin_start(20)
-        lw_frame.set_margin_end(20)
-        # lw_frame.set_margin_top(10)
-        lw_frame.set_margin_bottom(10)
-        sw = Gtk.ScrolledWindow()
-        # Create Gtk.Listview
-        lw = self.listview_str
-        sw.set_child(lw)
-        lw_frame.set_child(sw)
-        content.append(lw_frame)
-        frame.set_child(content)
-        # Add the content box as a new page in the stack
-        return self.stack.add_page(name, title, frame)
-
-    def setup_page_five(self, name, title):
-        """ Add a new page to the stack"""
-        # Content box for the page
-        frame, content, label = self.setup_page_header(name, title)
-        self.page5_label = label
-        # Material Color button
-        btn_row = ButtonRow(["Material Color"], self.on_button_chooser)
-        content.append(btn_row)
-        # Add the content box as a new page in the stack
-        return self.stack.add_page(name, title, frame)
-
-    def _get_text_markup(self, txt):
-        txt = f'<span foreground="#BF360C" weight="bold">{txt}</span>'
-        markup = get_font_markup('Noto Sans Regular 14', txt)
-        return markup
+    def on_export_response(self, dialog, response_id):
+        self.export_dialog = None
+        if response_id != Gtk.ResponseType.ACCEPT:
+            return
+        fn = dialog.get_file().get_path()
+        exporter = self.listview.export(fn, ['name', 'state'])
+        exporter.connect('progress', lambda exporter, fraction: self.set_status(
+            self.page4_label, f'exporting to {fn} : {fraction:.0%}'))
+        exporter.connect('done', lambda exporter, cancelled: self.set_status(
+            self.page4_label, f'export failed : {exporter.error}' if cancelled else f'list exported to {fn}'))
 
     def show_shortcuts(self):
-        builder = Gtk.Builder.new_from_file('shortcuts.ui')
-        shortcuts = builder.get_object('shortcuts')
-        shortcuts.present()
+        self.get_application().show_shortcuts(self)
 
     # ---------------------- Handlers --------------------------
 
@@ -675,13 +637,15 @@ class MyWindow(Window):
             self.close()
         elif name == 'shortcuts':
             self.show_shortcuts()
+        elif name == 'export':
+            self.show_export_dialog()
+        elif name == 'debug':
+            self.show_debug_page()
 
     def on_color_selected(self, widget):
         selected_color = self.chooser.get_rgba()
         color_txt = selected_color.to_string()
-        markup = self._get_text_markup(
-            f'{widget.get_label()} was pressed. {color_txt}')
-        self.page5_label.set_markup(markup)
+        self.set_status(self.page5_label, f'{widget.get_label()} was pressed. {color_txt}')
 
     def on_button_chooser(self, widget):
         """ callback for buttom clicked (Page1) """
@@ -695,13 +659,11 @@ class MyWindow(Window):
 
     def on_select_icon_selector(self, name):
         """ called when icon_selector selection is changed (Page1) """
-        markup = self._get_text_markup(f'{name} is selected')
-        self.page1_label.set_markup(markup)
+        self.set_status(self.page1_label, f'{name} is selected')
 
     def on_select_text_selector(self, name):
         """ called when text_selector is changed (Page2) """
-        markup = self._get_text_markup(f'{name} is selected')
-        self.page2_label.set_markup(markup)
+        self.set_status(self.page2_label, f'{name} is selected')
 
     def on_switch_activate(self, widget, state):
         """ callback for reveal switch (Page3) """
@@ -717,27 +679,26 @@ class MyWindow(Window):
 
     def on_button_clicked(self, widget):
         """ callback for buttom clicked (Page1) """
-        markup = self._get_text_markup(f'{widget.get_label()} was pressed')
-        self.page1_label.set_markup(markup)
+        self.set_status(self.page1_label, f'{widget.get_label()} was pressed')
 
     def on_calendar_changed(self, widget):
         """ callback for calendar selection (Page1) """
         date = widget.get_date().format('%F')
         txt = f'{date} was selected in calendar'
-        markup = self._get_text_markup(txt)
-        self.page1_label.set_markup(markup)
+        self.set_status(self.page1_label, txt)
 
     def on_entry_activate(self, widget):
         """ callback for entry actication (Page1) """
         txt = f'{widget.get_buffer().get_text()} was typed in entry'
-        markup = self._get_text_markup(txt)
-        self.page1_label.set_markup(markup)
+        self.set_status(self.page1_label, txt)
 
     def on_dialog_response(self, widget, response_id):
         if response_id == Gtk.ResponseType.OK:
             # get selected color in hex format
             color = widget.get_color()
             markup = f'<span size="xx-large" foreground="{color}">the color {color} was selected</span>'
+            # remove the status style, so it don't mix with the markup
+            self.page5_label.set_attributes(None)
             self.page5_label.set_markup(markup)
         elif response_id == Gtk.ResponseType.CANCEL:
             print("cancel")
@@ -748,18 +709,141 @@ class MyWindow(Window):
 
 
 class Application(Gtk.Application):
-    """ Main Aplication class """
+    """ Main Aplication class
+
+    The first instance is the primary instance, later invocations forward their command line
+    (or D-Bus activation) to it. With --resident the primary instance keeps running in the background,
+    with CSS, models, icons & palettes loaded and a hidden window ready to be shown.
+    """
 
     def __init__(self):
-        super().__init__(application_id='dk.rasmil.Example',
-                         flags=Gio.ApplicationFlags.FLAGS_NONE)
+        super().__init__(application_id=APP_ID,
+                         flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE | Gio.ApplicationFlags.HANDLES_OPEN)
+        self.add_main_option('resident', ord('r'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             'Keep running in the background, so new windows open instantly', None)
+        self.add_main_option('new-window', ord('n'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             'Open a new window', None)
+        self.add_main_option('quit', ord('q'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             'Quit the running instance', None)
+        self.resident = False
+        # prebuilt hidden window, used by the next activation in resident mode
+        self.spare = None
+        self.state = SessionState(STATE_FILE)
+        self.shortcuts = None
+        FactoryMetrics.enabled = DEBUG
+        if LEAKS:
+            import leaks
+            leaks.TRACKER.install()
+            leaks.TRACKER.watch_growth()
+
+    def do_startup(self):
+        Gtk.Application.do_startup(self)
+        # the custom css is parsed once and used by all windows
+        install_css('main.css')
+        APP_SERVICE_ACTIONS.register(self, self)
+        # started by D-Bus activation (--gapplication-service)
+        if self.get_flags() & Gio.ApplicationFlags.IS_SERVICE:
+            self.set_resident(True)
+
+    def show_shortcuts(self, parent: Gtk.Window):
+        """ show the shortcuts window, it is only build the first time and shared by all windows """
+        if self.shortcuts is None:
+            # shortcuts.ui is written from the accelerators of APP_ACTIONS by build_resources.py
+            builder = load_builder('shortcuts.ui')
+            self.shortcuts = builder.get_object('shortcuts')
+            self.shortcuts.set_hide_on_close(True)
+        self.shortcuts.set_transient_for(parent)
+        self.shortcuts.present()
+
+    def do_shutdown(self):
+        # write the pending state changes
+        self.state.flush()
+        if FactoryMetrics.get_all():
+            os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
+            FactoryMetrics.dump(METRICS_FILE)
+            print(f'list factory metrics written to : {METRICS_FILE}')
+        if LEAKS:
+            import leaks
+            leaks.TRACKER.report()
+        Gtk.Application.do_shutdown(self)
+
+    def do_command_line(self, command_line: Gio.ApplicationCommandLine):
+        """ handle the command line of this or a remote invocation (runs in the primary instance) """
+        options = command_line.get_options_dict().end().unpack()
+        if options.get('quit'):
+            self.quit()
+            return 0
+        if options.get('resident'):
+            self.set_resident(True)
+        files = [command_line.create_file_for_arg(arg) for arg in command_line.get_arguments()[1:]]
+        if files:
+            self.open(files, '')
+        elif options.get('new-window'):
+            self.new_window().present()
+        elif not options.get('resident'):
+            # a resident instance stays hidden, when it is started
+            self.activate()
+        return 0
 
     def do_activate(self):
-        win = self.props.active_window
-        if not win:
-            win = MyWindow("My Gtk4 Application", 800, 800, application=self)
+        win = self.get_visible_window()
+        if win is None:
+            win = self.new_window()
         win.present()
 
+    def do_open(self, files, n_files, hint):
+        for file in files:
+            win = self.new_window()
+            win.open_file(file)
+            win.present()
+
+    def set_resident(self, resident: bool):
+        """ keep the application running, without any visible windows """
+        if resident == self.resident:
+            return
+        self.resident = resident
+        if resident:
+            self.hold()
+            GLib.idle_add(self.warm_up, priority=GLib.PRIORITY_LOW)
+        else:
+            if self.spare is not None:
+                self.spare.destroy()
+                self.spare = None
+            self.release()
+
+    def warm_up(self):
+        """ load the things a new window needs, while the application is idle """
+        # the material palette is used by the Material Color dialog
+        importlib.import_module('material')
+        if self.resident and self.spare is None:
+            self.spare = MyWindow("My Gtk4 Application", 800, 800, application=self)
+        return GLib.SOURCE_REMOVE
+
+    def new_window(self) -> MyWindow:
+        """ get the prebuilt spare window (and build the next one when idle) or build a new one """
+        win = self.spare
+        self.spare = None
+        if win is None:
+            win = MyWindow("My Gtk4 Application", 800, 800, application=self)
+        if self.resident:
+            GLib.idle_add(self.warm_up, priority=GLib.PRIORITY_LOW)
+        return win
+
+    def get_visible_window(self):
+        """ the most recently focused visible window """
+        for win in self.get_windows():
+            if win.get_visible():
+                return win
+        return None
+
+    def on_app_action(self, action, state):
+        """ Callback for application actions (can be activated over D-Bus, see remote.py) """
+        name = action.get_name()
+        if name == 'new-window':
+            self.new_window().present()
+        elif name == 'quit':
+            self.quit()
+
 
 def main():
     """ Run the main application"""
@@ -0,0 +1,113 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Fast remote control of a running (resident) instance of the sample application
+
+It talks directly to the org.freedesktop.Application D-Bus interface of the primary instance,
+and only needs Gio, so it avoids the Gtk & widget imports of a second main.py invocation.
+If the application is not running, the D-Bus daemon starts it, when the service file is installed.
+
+usage: python3 remote.py [--wait SECONDS] activate | open FILE... | action NAME | service-file
+
+Test on a private session bus (nothing is installed in the user session):
+    mkdir -p /tmp/example/dbus-1/services
+    python3 remote.py service-file > /tmp/example/dbus-1/services/dk.rasmil.Example.service
+    XDG_DATA_DIRS=/tmp/example:/usr/share dbus-run-session -- sh -c \\
+        'python3 remote.py activate; python3 remote.py action new-window; python3 remote.py action quit'
+or without D-Bus activation:
+    dbus-run-session -- sh -c 'python3 main.py --resident & python3 remote.py --wait 10 activate'
+"""
+import argparse
+import os.path
+import sys
+import time
+
+from gi.repository import Gio, GLib
+
+APP_ID = 'dk.rasmil.Example'
+OBJECT_PATH = '/' + APP_ID.replace('.', '/')
+INTERFACE = 'org.freedesktop.Application'
+
+SERVICE_FILE = """[D-BUS Service]
+Name={app_id}
+Exec={python} {main} --gapplication-service
+"""
+
+
+def wait_for_name(connection: Gio.DBusConnection, timeout: float) -> bool:
+    """ wait until the application owns its bus name """
+    deadline = time.monotonic() + timeout
+    while True:
+        reply = connection.call_sync('org.freedesktop.DBus', '/org/freedesktop/DBus', 'org.freedesktop.DBus',
+                                     'NameHasOwner', GLib.Variant('(s)', (APP_ID,)), GLib.VariantType('(b)'),
+                                     Gio.DBusCallFlags.NONE, -1, None)
+        if reply.unpack()[0]:
+            return True
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+
+
+def call(connection: Gio.DBusConnection, method: str, parameters: GLib.Variant):
+    """ call a method on the application (the D-Bus daemon starts it if needed) """
+    connection.call_sync(APP_ID, OBJECT_PATH, INTERFACE, method, parameters, None,
+                         Gio.DBusCallFlags.NONE, -1, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remote control of the sample application')
+    parser.add_argument('--wait', type=float, default=0,
+                        help='wait up to SECONDS for the application to start (when not D-Bus activated)')
+    parser.add_argument('command', choices=['activate', 'open', 'action', 'service-file'])
+    parser.add_argument('args', nargs='*')
+    args = parser.parse_args()
+
+    if args.command == 'service-file':
+        main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+        print(SERVICE_FILE.format(app_id=APP_ID, python=sys.executable, main=main_py), end='')
+        return 0
+
+    start = time.perf_counter()
+    try:
+        connection = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        if args.wait and not wait_for_name(connection, args.wait):
+            print(f'{APP_ID} is not running')
+            return 1
+        # platform data, so the window gets the focus
+        platform_data = {}
+        startup_id = os.environ.get('DESKTOP_STARTUP_ID')
+        if startup_id:
+            platform_data['desktop-startup-id'] = GLib.Variant('s', startup_id)
+        if args.command == 'activate':
+            call(connection, 'Activate', GLib.Variant('(a{sv})', (platform_data,)))
+        elif args.command == 'open':
+            uris = [Gio.File.new_for_commandline_arg(arg).get_uri() for arg in args.args]
+            call(connection, 'Open', GLib.Variant('(assa{sv})', (uris, '', platform_data)))
+        else:
+            if len(args.args) != 1:
+                parser.error('action needs an action name (ex. new-window or quit)')
+            call(connection, 'ActivateAction', GLib.Variant('(sava{sv})', (args.args[0], [], platform_data)))
+    except GLib.Error as e:
+        print(f"Error calling {APP_ID} : {e} ")
+        return 1
+    print(f'{args.command} : {(time.perf_counter() - start) * 1000:.1f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Gio.ListModel backed by a SQLite query
+
+The rows is fetched a page at a time, when the view asks for them, and the last pages is cached.
+The number of rows comes from the database (SELECT COUNT(*)) and sorting & filtering is done
+by the database (ORDER BY & WHERE), so a large table opens fast and the memory use is flat.
+
+Pages after a page there is already fetched is read with keyset pagination, (sort value, key) > last row,
+so scrolling through the table don't get slower at the end, like LIMIT/OFFSET does.
+Create an index on the sort columns, to make sorting fast on large tables.
+"""
+import sqlite3
+from collections import OrderedDict
+
+from gi.repository import GObject, Gio, Gtk
+
+
+def quote(name: str) -> str:
+    """ quote a SQL identifier """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def like_pattern(text: str) -> str:
+    """ LIKE pattern matching text anywhere (used with ESCAPE '\\') """
+    text = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{text}%'
+
+
+class SQLiteListModel(GObject.GObject, Gio.ListModel):
+    """ Gio.ListModel showing the rows of a SQLite table
+
+    db: a sqlite3.Connection or the filename of the database
+    columns: the table columns to read, item_factory(row) creates the item for a row (a dict with column name -> value),
+    it is only called when the item is requested, the last cache_size items is cached.
+    key: a unique column, used as tie breaker in sorting & for keyset pagination
+    It can be used as data model in a ListViewBase or ViewColumnBase, by returning it in setup_store
+    """
+    cache_size = 1000
+
+    def __init__(self, item_type, db, table: str, columns: list, item_factory, key='rowid',
+                 page_size=200, cache_pages=50):
+        super(SQLiteListModel, self).__init__()
+        self.item_type = item_type
+        self.connection = db if isinstance(db, sqlite3.Connection) else sqlite3.connect(db)
+        self.table = table
+        self.columns = columns
+        self.item_factory = item_factory
+        self.key = key
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.order_column = None
+        self.descending = False
+        self.queries = 0
+        self._where = ''
+        self._params = ()
+        self._pages = OrderedDict()
+        # (sort value, key) of the last row of the fetched pages
+        self._anchors = {}
+        self._cache = OrderedDict()
+        self._n_items = self._count()
+
+    def do_get_item_type(self):
+        return self.item_type.__gtype__
+
+    def do_get_n_items(self):
+        return self._n_items
+
+    def do_get_item(self, position):
+        if position >= self._n_items:
+            return None
+        item = self._cache.get(position)
+        if item is None:
+            item = self.item_factory(self.get_row(position))
+            self._cache[position] = item
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(position)
+        return item
+
+    def get_row(self, position: int) -> dict:
+        """ get the values of a row, as a dict with column name -> value """
+        page = position // self.page_size
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._fetch(page)
+            self._pages[page] = rows
+            if len(self._pages) > self.cache_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        row = rows[position % self.page_size]
+        return dict(zip(self.columns, row[1:]))
+
+    def set_order(self, column: str = None, descending=False):
+        """ sort the rows by a column (None = table order) """
+        if column is not None and column not in self.columns:
+            raise ValueError(f'{column} is not a column in the model')
+        self.order_column = column
+        self.descending = descending
+        self.refresh()
+
+    def set_filter(self, text: str, columns: list = None):
+        """ only show the rows where one of the columns (default all) contains text """
+        if text:
+            columns = columns or self.columns
+            self._where = ' OR '.join(f"{quote(column)} LIKE ? ESCAPE '\\'" for column in columns)
+            self._params = (like_pattern(text),) * len(columns)
+        else:
+            self._where = ''
+            self._params = ()
+        self.refresh()
+
+    def set_where(self, where: str, params=()):
+        """ only show the rows matching a SQL expression, ex. set_where('size > ?', (1000,)) """
+        self._where = where
+        self._params = tuple(params)
+        self.refresh()
+
+    def refresh(self):
+        """ reread the rows from the database (ex. if the table has changed) """
+        self._pages.clear()
+        self._anchors.clear()
+        self._cache.clear()
+        old_size = self._n_items
+        self._n_items = self._count()
+        self.items_changed(0, old_size, self._n_items)
+
+    def _count(self) -> int:
+        where = f' WHERE {self._where}' if self._where else ''
+        return self._execute(f'SELECT COUNT(*) FROM {quote(self.table)}{where}', self._params).fetchone()[0]
+
+    def _fetch(self, page: int) -> list:
+        key = quote(self.key)
+        columns = ', '.join(quote(column) for column in self.columns)
+        direction = 'DESC' if self.descending else 'ASC'
+        if self.order_column is None:
+            order_by = f'{key} {direction}'
+        else:
+            order_by = f'{quote(self.order_column)} {direction}, {key} {direction}'
+        anchor = self._anchors.get(page - 1)
+        offset = page * self.page_size if page and anchor is None else 0
+        rows = []
+        # the parts of the table after the anchor, in sort order
+        for clause, params in self._after(anchor):
+            clauses = [f'({self._where})'] if self._where else []
+            if clause:
+                clauses.append(clause)
+            where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+            sql = f'SELECT {key}, {columns} FROM {quote(self.table)}{where} ORDER BY {order_by} LIMIT ?'
+            params = list(self._params) + params + [self.page_size - len(rows)]
+            if offset:
+                sql += ' OFFSET ?'
+                params.append(offset)
+            rows.extend(self._execute(sql, params).fetchall())
+            if len(rows) == self.page_size:
+                break
+        if rows:
+            last = rows[-1]
+            sort_value = last[1 + self.columns.index(self.order_column)] if self.order_column else None
+            self._anchors[page] = (sort_value, last[0])
+        return rows
+
+    def _after(self, anchor) -> list:
+        """ (where clause, params) of the rows after anchor (sort value, key), in sort order
+
+        The comparisons is written so they can use an index on the sort column,
+        NULL is sorted first in ascending order and last in descending order.
+        """
+        if anchor is None:
+            return [(None, [])]
+        key = quote(self.key)
+        after = '<' if self.descending else '>'
+        value, row_key = anchor
+        if self.order_column is None:
+            return [(f'{key} {after} ?', [row_key])]
+        column = quote(self.order_column)
+        if value is None:
+            after_null = (f'{column} IS NULL AND {key} {after} ?', [row_key])
+            return [after_null] if self.descending else [after_null, (f'{column} IS NOT NULL', [])]
+        after_value = (f'({column}, {key}) {after} (?, ?)', [value, row_key])
+        return [after_value, (f'{column} IS NULL', [])] if self.descending else [after_value]
+
+    def _execute(self, sql: str, params):
+        self.queries += 1
+        return self.connection.execute(sql, params)
+
+    def bind_column_view(self, col_view: Gtk.ColumnView, columns: dict):
+        """ sort the model, when a column header in the ColumnView is clicked
+
+        columns: dict with Gtk.ColumnViewColumn -> model column name
+        The sorting is done by the database, so the model must not be wrapped in a Gtk.SortListModel
+        It needs GTK 4.10 (Gtk.ColumnViewSorter), with older versions the columns can't be sorted
+        """
+        if (Gtk.get_major_version(), Gtk.get_minor_version()) < (4, 10):
+            print(f'Error: sorting by column headers needs GTK 4.10, running {Gtk.get_major_version()}.'
+                  f'{Gtk.get_minor_version()}')
+            return
+        for view_column in columns:
+            # a sorter makes the header clickable, it is never used to compare rows
+            view_column.set_sorter(Gtk.CustomSorter.new(None))
+
+        def on_sorter_changed(sorter, change):
+            view_column = sorter.get_primary_sort_column()
+            if view_column in columns:
+                self.set_order(columns[view_column], sorter.get_primary_sort_order() == Gtk.SortType.DESCENDING)
+            else:
+                self.set_order(None)
+
+        col_view.get_sorter().connect('changed', on_sorter_changed)
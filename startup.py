@@ -0,0 +1,98 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Startup diagnostics: import times (like python -X importtime) & time to first window
+
+It only uses the standard library, so it can be imported before gi and
+measure the imports of the GObject introspection modules too.
+"""
+import builtins
+import sys
+import time
+
+START = time.perf_counter()
+
+
+class ImportTimer:
+    """ Measure the time used by first time imports (self & cumulative time) """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._import = None
+
+    def install(self):
+        if self._import is None:
+            self._import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def _new_modules(self, name, fromlist, level):
+        """ the modules there will be loaded by the import """
+        if level:
+            return []
+        if name not in sys.modules:
+            return [name]
+        # from package import module (ex. from gi.repository import Gtk)
+        return [f'{name}.{sub}' for sub in fromlist or () if f'{name}.{sub}' not in sys.modules]
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        modules = self._new_modules(name, fromlist, level)
+        if not modules:
+            return self._import(name, globals, locals, fromlist, level)
+        depth = len(self._stack)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            # only report the modules there was loaded (not failed imports)
+            loaded = [module for module in modules if module in sys.modules]
+            if loaded:
+                self.records.append((', '.join(loaded), elapsed - children, elapsed, depth))
+
+    def report(self, min_time=0.001, file=sys.stderr):
+        """ print the imports there took more than min_time seconds, in -X importtime style """
+        print('import time: self [us] | cumulative | imported package', file=file)
+        for name, self_time, cumulative, depth in self.records:
+            if cumulative >= min_time:
+                print(f'import time: {self_time * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {"  " * depth}{name}',
+                      file=file)
+
+
+IMPORTS = ImportTimer()
+
+
+def report_first_window(window, file=sys.stderr):
+    """ print the time from startup until the window is drawn the first time """
+
+    def on_tick(widget, frame_clock):
+        print(f'time to first window : {(time.perf_counter() - START) * 1000:.1f} ms', file=file)
+        IMPORTS.report(file=file)
+        IMPORTS.uninstall()
+        return False
+
+    window.add_tick_callback(on_tick)
@@ -0,0 +1,106 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Ingestor tests: parse lines in worker processes into a ColumnarListModel,
+and the shared memory blocks is freed, also when the ingest is shutdown
+"""
+import os
+import time
+
+import pytest
+
+gi = pytest.importorskip('gi')
+from gi.repository import GLib, GObject
+
+from ingest import ColumnarListModel, Ingestor
+
+COLUMNS = [('name', 's'), ('size', 'q'), ('ratio', 'd')]
+
+
+class Row(GObject.GObject):
+    def __init__(self, row):
+        super(Row, self).__init__()
+        self.name = row['name']
+        self.size = row['size']
+
+
+def parse_lines(lines):
+    """ parse 'name,size' lines, runs in a worker process """
+    rows = []
+    for line in lines:
+        name, size = line.split(',')
+        rows.append((name, int(size), int(size) / 10))
+    return rows
+
+
+def fail(lines):
+    raise ValueError('bad chunk')
+
+
+def shm_segments() -> set:
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+def wait_for(condition, timeout=10.0):
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        context.iteration(False)
+        time.sleep(0.001)
+    return condition()
+
+
+def make_chunks(n_chunks, n_lines):
+    return [[f'ø row {chunk}-{ndx},{chunk * n_lines + ndx}' for ndx in range(n_lines)] for chunk in range(n_chunks)]
+
+
+def test_ingest():
+    before = shm_segments()
+    model = ColumnarListModel(Row, COLUMNS, Row)
+    ingestor = Ingestor(model, parse_lines, max_workers=2)
+    for chunk in make_chunks(8, 500):
+        ingestor.submit(chunk)
+    assert wait_for(lambda: ingestor.pending == 0)
+    ingestor.shutdown()
+    assert model.get_n_items() == 4000
+    assert model.get_row(1234) == {'name': 'ø row 2-234', 'size': 1234, 'ratio': 123.4}
+    assert model.get_item(3999).name == 'ø row 7-499'
+    assert shm_segments() - before == set()
+
+
+def test_failed_chunk():
+    model = ColumnarListModel(Row, COLUMNS, Row)
+    ingestor = Ingestor(model, fail, max_workers=1)
+    ingestor.submit(['a,1'])
+    assert wait_for(lambda: ingestor.pending == 0)
+    ingestor.shutdown()
+    assert model.get_n_items() == 0
+
+
+def test_shutdown_frees_results():
+    before = shm_segments()
+    model = ColumnarListModel(Row, COLUMNS, Row)
+    ingestor = Ingestor(model, parse_lines, max_workers=2)
+    futures = [ingestor.submit(chunk) for chunk in make_chunks(4, 500)]
+    # the results is done, but not added to the model (the main loop don't run)
+    for future in futures:
+        future.result()
+    ingestor.shutdown()
+    wait_for(lambda: False, timeout=0.2)
+    assert model.get_n_items() == 0
+    assert shm_segments() - before == set()
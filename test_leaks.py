@@ -0,0 +1,44 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+Leak test: the live GObject counts must return to the baseline after opening & closing windows
+
+It needs a display, to run headless use a virtual display, ex.
+    xvfb-run python3 -m pytest test_leaks.py
+"""
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk
+
+if not Gtk.init_check():
+    pytest.skip('no display', allow_module_level=True)
+
+import leaks
+
+
+@pytest.fixture(scope='module')
+def app():
+    leaks.TRACKER.install()
+    return leaks.make_app()
+
+
+def test_window_cycle_no_leaks(app):
+    grown = leaks.check_cycle(lambda: leaks.window_cycle(app), cycles=3)
+    assert not grown, f'live objects has grown after 3 cycles : {grown}'
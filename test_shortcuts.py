@@ -0,0 +1,40 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+shortcuts.ui must have the accelerators of APP_ACTIONS (run build_resources.py to update it)
+"""
+import os.path
+
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk
+
+if not Gtk.init_check():
+    pytest.skip('no display', allow_module_level=True)
+
+from main import APP_ACTIONS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_shortcuts_ui_is_up_to_date():
+    with open(os.path.join(BASE_DIR, 'shortcuts.ui')) as f:
+        lines = [line for line in f.read().splitlines() if not line.startswith('<!--')]
+    assert lines == APP_ACTIONS.get_shortcuts_xml().splitlines()
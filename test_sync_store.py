@@ -0,0 +1,80 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+sync_store tests: snapshots build separately keeps the row objects, only the changed values is updated
+
+It needs a display, to run headless use a virtual display, ex.
+    xvfb-run python3 -m pytest test_sync_store.py
+"""
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gio, GObject, Gtk
+
+if not Gtk.init_check():
+    pytest.skip('no display', allow_module_level=True)
+
+from widgets import RowObject, sync_store
+
+
+class Row(RowObject):
+    key = GObject.Property(type=int, default=0)
+    name = GObject.Property(type=str, default='')
+
+
+def snapshot(names):
+    return [Row(key=ndx, name=name) for ndx, name in enumerate(names)]
+
+
+def make_store(rows):
+    store = Gio.ListStore.new(Row)
+    store.splice(0, 0, rows)
+    changes = []
+    store.connect('items-changed', lambda store, position, removed, added: changes.append((position, removed, added)))
+    return store, changes
+
+
+def test_equal_snapshots():
+    names = [f'row {ndx}' for ndx in range(1000)]
+    rows = snapshot(names)
+    store, changes = make_store(rows)
+    assert sync_store(store, snapshot(names), key='key') == 0
+    assert changes == []
+    assert all(old is new for old, new in zip(rows, store))
+
+
+def test_changed_values():
+    rows = snapshot(['a', 'b', 'c'])
+    store, changes = make_store(rows)
+    notified = []
+    rows[1].connect('notify::name', lambda row, pspec: notified.append(row.name))
+    sync_store(store, snapshot(['a', 'x', 'c']), key='key')
+    assert changes == []
+    assert list(store) == rows
+    assert notified == ['x']
+
+
+def test_changed_func_replaces_rows():
+    rows = snapshot(['a', 'b', 'c'])
+    store, changes = make_store(rows)
+    new_rows = snapshot(['a', 'x', 'c'])
+    sync_store(store, new_rows, key='key', changed=lambda old, new: old.name != new.name)
+    assert changes == [(1, 1, 1)]
+    assert [row.name for row in store] == ['a', 'x', 'c']
+    assert store[0] is rows[0] and store[1] is new_rows[1]
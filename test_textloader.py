@@ -0,0 +1,84 @@
+#  Copyright (C) 2021 Tim Lauridsen < tla[at]rasmil.dk >
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to
+#  the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""
+TextLoader tests: multibyte UTF-8 text split across the chunks, and an incomplete sequence at the end
+
+It needs a display, to run headless use a virtual display, ex.
+    xvfb-run python3 -m pytest test_textloader.py
+"""
+import time
+
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version("Gtk", "4.0")
+from gi.repository import GLib, Gtk
+
+if not Gtk.init_check():
+    pytest.skip('no display', allow_module_level=True)
+
+from widgets import TextLoader
+
+
+def load(fn, chunk_size):
+    """ load the file into a text view, returns the text and the done signals """
+    view = Gtk.TextView()
+    loader = TextLoader(view, str(fn))
+    loader.chunk_size = chunk_size
+    done = []
+    loader.connect('done', lambda loader, cancelled: done.append(cancelled))
+    loader.start()
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + 5
+    while not done and time.monotonic() < deadline:
+        context.iteration(False)
+    buffer = view.get_buffer()
+    return buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), True), done
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7])
+def test_multibyte_across_chunks(tmp_path, chunk_size):
+    text = 'æøå € 𝄞 ' * 20
+    fn = tmp_path / 'text.txt'
+    fn.write_bytes(text.encode('utf-8'))
+    loaded, done = load(fn, chunk_size)
+    assert loaded == text
+    assert done == [False]
+
+
+def test_incomplete_sequence_at_end(tmp_path):
+    fn = tmp_path / 'text.txt'
+    # the last char (€) is cut after 2 of its 3 bytes
+    fn.write_bytes('abc €'.encode('utf-8')[:-1])
+    loaded, done = load(fn, 3)
+    assert loaded == 'abc �'
+    assert done == [False]
+
+
+def test_restart_is_not_cancelled(tmp_path):
+    fn = tmp_path / 'text.txt'
+    fn.write_bytes(b'x' * 100000)
+    view = Gtk.TextView()
+    loader = TextLoader(view, str(fn))
+    loader.chunk_size = 10
+    done = []
+    loader.connect('done', lambda loader, cancelled: done.append(cancelled))
+    loader.start()
+    loader.start()
+    loader.cancel()
+    assert done == [True]
@@ -22,16 +22,31 @@ It takes some of the hassle away from building Gtk4 application in Python
 So you can create an cool application, without all the boilerplate code
 
 """
+import codecs
+import csv
+import heapq
+import json
+import mmap
 import os.path
+import queue
+import re
+import threading
+import time
+import weakref
 
 from abc import abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from operator import attrgetter
+from xml.sax.saxutils import escape
 
 import gi
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk, Gio, GLib, Gdk
-
-from material import MATERIAL
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gtk, Gio, GLib, GObject, Gdk, GdkPixbuf, Pango
 
 
 def rgb_to_hex(r, g, b):
@@ -50,11 +65,792 @@ def get_font_markup(fontdesc, text):
     return f'<span font_desc="{fontdesc}">{text}</span>'
 
 
+_text_styles = {}
+
+
+def get_text_style(font=None, color=None, weight=None) -> Pango.AttrList:
+    """ Get a Pango.AttrList for a (font, color, weight) style
+
+    The attribute list is only built the first time a style is used, and is
+    shared by all labels using the style.
+    font: Pango font description (ex. 'Noto Sans Regular 14')
+    color: color in a format Pango can parse (ex. '#BF360C')
+    weight: Pango.Weight or the name of it (ex. 'bold')
+    """
+    key = (font, color, weight)
+    attrs = _text_styles.get(key)
+    if attrs is None:
+        attrs = Pango.AttrList()
+        if font:
+            attrs.insert(Pango.attr_font_desc_new(Pango.FontDescription.from_string(font)))
+        if color:
+            pango_color = Pango.Color()
+            if not pango_color.parse(color):
+                raise ValueError(f"Color: {color} is not valid")
+            attrs.insert(Pango.attr_foreground_new(pango_color.red, pango_color.green, pango_color.blue))
+        if weight:
+            if isinstance(weight, str):
+                weight = getattr(Pango.Weight, weight.upper())
+            attrs.insert(Pango.attr_weight_new(weight))
+        _text_styles[key] = attrs
+    return attrs
+
+
+def set_styled_text(label: Gtk.Label, text: str, font=None, color=None, weight=None):
+    """ Set the text of a Gtk.Label using a cached style
+
+    It is faster than set_markup, because there is no markup to parse, and the text
+    is used as it is, so it don't need to be escaped.
+    """
+    label.set_text(text)
+    label.set_attributes(get_text_style(font, color, weight))
+
+
+# Directory containing the ui, css & resource files, so they are found independent of the CWD
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Prefix of the files in the compiled resource bundle (see build_resources.py)
+RESOURCE_PREFIX = '/dk/rasmil/Example'
+
+_resources = {}
+
+
+def load_resources(fn: str):
+    """ Load & register a compiled .gresource bundle, it is only done once per file
+
+    The bundle is memory mapped by Gio, so the content is not read into memory
+    Returns None if the bundle don't exist (not build yet)
+    """
+    if not os.path.isabs(fn):
+        fn = os.path.join(BASE_DIR, fn)
+    if fn in _resources:
+        return _resources[fn]
+    if not os.path.exists(fn):
+        return None
+    resource = Gio.Resource.load(fn)
+    Gio.resources_register(resource)
+    _resources[fn] = resource
+    return resource
+
+
+def resolve_path(fn: str) -> str:
+    """ Get the location of a data file
+
+    Returns a resource:// uri, if the file is in a registered resource bundle,
+    else the path to the file, relative to the directory of this module.
+    """
+    if fn.startswith('resource://') or os.path.isabs(fn):
+        return fn
+    res_path = f'{RESOURCE_PREFIX}/{fn}'
+    try:
+        Gio.resources_get_info(res_path, Gio.ResourceLookupFlags.NONE)
+        return f'resource://{res_path}'
+    except GLib.Error:
+        return os.path.join(BASE_DIR, fn)
+
+
+def load_builder(fn: str) -> Gtk.Builder:
+    """ Create a Gtk.Builder from a ui file, from the resource bundle if it is registered """
+    path = resolve_path(fn)
+    if path.startswith('resource://'):
+        return Gtk.Builder.new_from_resource(path[len('resource://'):])
+    return Gtk.Builder.new_from_file(path)
+
+
+def ui_template(fn: str) -> Gtk.Template:
+    """ Gtk.Template decorator for a composite widget class, with the template in a ui file
+
+    The ui file is used from the resource bundle, if it is registered when the class is defined
+    """
+    path = resolve_path(fn)
+    if path.startswith('resource://'):
+        return Gtk.Template(resource_path=path[len('resource://'):])
+    return Gtk.Template(filename=path)
+
+
+_css_providers = {}
+
+
+def load_css(css_fn: str):
+    """ Create a Gtk.CssProvider from a css file, it is only parsed once per file
+
+    css_fn can be a file in the resource bundle, a resource:// uri or a path
+    Returns None if the file don't exist or has errors
+    """
+    if not css_fn:
+        return None
+    css_fn = resolve_path(css_fn)
+    if css_fn in _css_providers:
+        return _css_providers[css_fn]
+    is_resource = css_fn.startswith('resource://')
+    if not (is_resource or os.path.exists(css_fn)):
+        return None
+    css_provider = Gtk.CssProvider()
+    try:
+        if is_resource:
+            css_provider.load_from_resource(css_fn[len('resource://'):])
+        else:
+            css_provider.load_from_path(css_fn)
+    except GLib.Error as e:
+        print(f"Error loading CSS : {e} ")
+        return None
+    print(f'loading custom styling : {css_fn}')
+    _css_providers[css_fn] = css_provider
+    return css_provider
+
+
+def install_css(css_fn: str, display: Gdk.Display = None):
+    """ Add the styling from a css file to all widgets on a display (default display if None)
+
+    The selectors in the file should be scoped with a css class, as they match all windows
+    """
+    css_provider = load_css(css_fn)
+    display = display or Gdk.Display.get_default()
+    if css_provider and display:
+        Gtk.StyleContext.add_provider_for_display(display, css_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER)
+    return css_provider
+
+
+class TemplateChild(Gtk.Template.Child):
+    """ Gtk.Template.Child with the type the child must have
+
+    The attribute name must be the same as the object id in the ui file.
+    The types are checked by TemplatePage, so a wrong class or id in the ui file
+    gives an error, when the page is created and not when the child is used
+    """
+
+    def __init__(self, child_type=Gtk.Widget, **kwargs):
+        super(TemplateChild, self).__init__(**kwargs)
+        self.child_type = child_type
+
+
+_worker = None
+
+
+def run_in_worker(func, callback, *args):
+    """ Run func(*args) in a worker thread and call callback(result) in the main thread """
+    global _worker
+    if _worker is None:
+        _worker = ThreadPoolExecutor(max_workers=4, thread_name_prefix='widgets-worker')
+
+    def _idle(future):
+        callback(future.result())
+        return GLib.SOURCE_REMOVE
+
+    def _done(future):
+        # cancelled jobs don't call back
+        if not future.cancelled():
+            GLib.idle_add(_idle, future)
+
+    future = _worker.submit(func, *args)
+    future.add_done_callback(_done)
+    return future
+
+
+_async_loop = None
+
+
+def run_in_async_loop(coro, callback):
+    """ Run a coroutine in a shared asyncio event loop thread and call callback(result) in the main thread
+
+    returns a concurrent.futures.Future, cancelling it cancels the coroutine
+    """
+    global _async_loop
+    # asyncio is only loaded when it is used
+    import asyncio
+    if _async_loop is None:
+        _async_loop = asyncio.new_event_loop()
+        threading.Thread(target=_async_loop.run_forever, name='widgets-asyncio', daemon=True).start()
+
+    def _idle(future):
+        callback(future.result())
+        return GLib.SOURCE_REMOVE
+
+    def _done(future):
+        # cancelled jobs don't call back
+        if not future.cancelled():
+            GLib.idle_add(_idle, future)
+
+    future = asyncio.run_coroutine_threadsafe(coro, _async_loop)
+    future.add_done_callback(_done)
+    return future
+
+
+class StatusSink:
+    """ Apply updates to a widget at most once per frame
+
+    update() can be called from any thread, only the latest value is kept, and it
+    is applied by the callback in a tick callback on the widget frame clock.
+    So a burst of updates only cost one layout per frame.
+    min_interval: optional minimum time in seconds between applied updates
+    """
+
+    def __init__(self, widget: Gtk.Widget, callback, min_interval=0.0):
+        self.widget = widget
+        self.callback = callback
+        self.min_interval = min_interval
+        self.updates = 0
+        self.applied = 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._scheduled = False
+        self._last_frame = 0
+
+    def update(self, *args):
+        """ set a new value, the args is passed to the callback """
+        with self._lock:
+            self._pending = args
+            self.updates += 1
+            if self._scheduled:
+                return
+            self._scheduled = True
+        if threading.current_thread() is threading.main_thread():
+            self._schedule()
+        else:
+            GLib.idle_add(self._schedule)
+
+    def flush(self):
+        """ apply the pending value now (must be called from the main thread) """
+        self._apply()
+
+    def _schedule(self):
+        if self.widget.get_mapped():
+            self.widget.add_tick_callback(self._on_tick)
+        else:
+            # no frames is drawn for an unmapped widget, so there is no layout to save
+            self._apply()
+        return GLib.SOURCE_REMOVE
+
+    def _on_tick(self, widget, frame_clock):
+        if self.min_interval:
+            now = frame_clock.get_frame_time()  # in microseconds
+            if now - self._last_frame < self.min_interval * 1000000:
+                return GLib.SOURCE_CONTINUE
+            self._last_frame = now
+        self._apply()
+        return GLib.SOURCE_REMOVE
+
+    def _apply(self):
+        with self._lock:
+            args = self._pending
+            self._pending = None
+            self._scheduled = False
+        if args is not None:
+            self.applied += 1
+            self.callback(*args)
+
+
+class NotifyBatch:
+    """ Emit the property change notifications of changed items once per frame
+
+    The first change of an item in a frame freezes its notifications (freeze_notify), they are
+    thawed before the next frame is drawn, so many changes of a property only emits one notify.
+    If widget is given and mapped, it is thawed in a tick callback on its frame clock,
+    else in a high priority idle callback, there runs before the redraw.
+    Must be used from the main thread.
+    """
+
+    def __init__(self, widget: Gtk.Widget = None):
+        self.widget = widget
+        self.changes = 0
+        self.thawed = 0
+        self._frozen = {}
+        self._scheduled = False
+
+    def add(self, item: GObject.GObject):
+        """ freeze the notifications of item until the next frame """
+        self.changes += 1
+        if item in self._frozen:
+            return
+        item.freeze_notify()
+        self._frozen[item] = None
+        if not self._scheduled:
+            self._scheduled = True
+            if self.widget is not None and self.widget.get_mapped():
+                self.widget.add_tick_callback(self._on_tick)
+            else:
+                GLib.idle_add(self.flush, priority=GLib.PRIORITY_HIGH_IDLE + 10)
+
+    def _on_tick(self, widget, frame_clock):
+        return self.flush()
+
+    def flush(self):
+        """ emit the pending notifications now """
+        frozen = self._frozen
+        self._frozen = {}
+        self._scheduled = False
+        for item in frozen:
+            item.thaw_notify()
+        self.thawed += len(frozen)
+        return GLib.SOURCE_REMOVE
+
+
+NOTIFY_BATCH = NotifyBatch()
+
+
+class RowObject(GObject.GObject):
+    """ Base class for model items with observable values
+
+    Declare the values as GObject properties in the subclass, ex.
+        name = GObject.Property(type=str, default='')
+    A change emits notify::name, so a view with 'name' in watch_properties updates the
+    visible rows showing the item, without a splice in the data model.
+    Use update() for values there change many times per frame, the notifications is batched.
+    """
+    batch = NOTIFY_BATCH
+
+    def update(self, **values):
+        """ set property values, the change notifications is emitted before the next frame """
+        self.batch.add(self)
+        for name, value in values.items():
+            self.set_property(name, value)
+
+
+def _runs(indexes: list) -> list:
+    """ group sorted indexes into (start, length) runs """
+    runs = []
+    for ndx in indexes:
+        if runs and runs[-1][0] + runs[-1][1] == ndx:
+            runs[-1][1] += 1
+        else:
+            runs.append([ndx, 1])
+    return runs
+
+
+def _stable_rows(positions: list) -> set:
+    """ indexes in positions, there is part of the longest increasing subsequence
+    (the rows there don't need to be moved)
+    """
+    tails = []
+    tails_ndx = []
+    prev = [-1] * len(positions)
+    for i, pos in enumerate(positions):
+        j = bisect_left(tails, pos)
+        if j == len(tails):
+            tails.append(pos)
+            tails_ndx.append(i)
+        else:
+            tails[j] = pos
+            tails_ndx[j] = i
+        prev[i] = tails_ndx[j - 1] if j > 0 else -1
+    stable = set()
+    i = tails_ndx[-1] if tails_ndx else -1
+    while i >= 0:
+        stable.add(i)
+        i = prev[i]
+    return stable
+
+
+def _update_row(old, new) -> bool:
+    """ default changed for sync_store, the row object is kept, the values of new is set on it,
+    so a view watching the properties only updates the changed cells
+    """
+    if old is new or type(old) is not type(new) or not isinstance(old, GObject.Object):
+        return False
+    for pspec in old.list_properties():
+        if not pspec.flags & GObject.ParamFlags.WRITABLE or pspec.flags & GObject.ParamFlags.CONSTRUCT_ONLY:
+            continue
+        value = new.get_property(pspec.name)
+        if old.get_property(pspec.name) != value:
+            old.set_property(pspec.name, value)
+    return False
+
+
+def sync_store(store: Gio.ListStore, new_items, key=None, changed=None, selection=None) -> int:
+    """ Update store to contain new_items, using as few splices as possible
+
+    Rows are matched by key (callable or attribute name, default the item itself),
+    rows with an unchanged key keeps their position, so only rows there is added,
+    removed, moved or changed are rebound by the view.
+    changed(old, new) returns True if a row must be replaced, default is to keep the row object
+    and set the GObject property values there differ on it (see RowObject)
+    selection: Gtk.SingleSelection, the selected row is selected again, if it has moved or changed
+    Returns the number of splices used
+    """
+    if key is None:
+        key = lambda item: item
+    elif isinstance(key, str):
+        key = attrgetter(key)
+    if changed is None:
+        changed = _update_row
+    new_items = list(new_items)
+    new_keys = [key(item) for item in new_items]
+    new_pos = {k: i for i, k in enumerate(new_keys)}
+    current = list(store)
+    selected_key = None
+    if selection is not None and selection.get_selected_item() is not None:
+        selected_key = key(selection.get_selected_item())
+    splices = 0
+    # remove rows there is not in new_items, or must be moved
+    kept = [i for i, item in enumerate(current) if key(item) in new_pos]
+    stable = {kept[i] for i in _stable_rows([new_pos[key(current[i])] for i in kept])}
+    for start, length in reversed(_runs([i for i in range(len(current)) if i not in stable])):
+        store.splice(start, length, [])
+        splices += 1
+    current = [current[i] for i in sorted(stable)]
+    # the remaining rows is now in the same order as in new_items, add the missing rows
+    # and replace the changed rows, in runs of rows
+    i = j = 0
+    while i < len(new_items):
+        start = i
+        if j < len(current) and key(current[j]) == new_keys[i]:
+            while i < len(new_items) and j < len(current) and key(current[j]) == new_keys[i] \
+                    and changed(current[j], new_items[i]):
+                i += 1
+                j += 1
+            if i > start:
+                store.splice(start, i - start, new_items[start:i])
+                splices += 1
+            else:
+                i += 1
+                j += 1
+        else:
+            while i < len(new_items) and (j >= len(current) or key(current[j]) != new_keys[i]):
+                i += 1
+            store.splice(start, 0, new_items[start:i])
+            splices += 1
+    if selected_key is not None and selected_key in new_pos:
+        if selection.get_selected() != new_pos[selected_key]:
+            selection.set_selected(new_pos[selected_key])
+    return splices
+
+
+class FactoryMetrics:
+    """ Counts & timings of the list item factory callbacks of a view
+
+    Set FactoryMetrics.enabled = True, before the views is created, to collect
+    metrics for all ListViewBase & ViewColumnBase views.
+    The metrics is kept by the view, they are removed when the view is destroyed.
+    """
+    enabled = False
+    # upper limits of the bind latency histogram buckets in microseconds
+    buckets = (50, 100, 250, 500, 1000, 5000, 10000, 50000)
+    _all = weakref.WeakValueDictionary()
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = {'setup': 0, 'bind': 0, 'unbind': 0, 'teardown': 0}
+        self.total = {'setup': 0.0, 'bind': 0.0, 'unbind': 0.0, 'teardown': 0.0}
+        self.max = {'setup': 0.0, 'bind': 0.0, 'unbind': 0.0, 'teardown': 0.0}
+        self.bind_histogram = [0] * (len(self.buckets) + 1)
+        self.selections = 0
+        self._selection_times = []
+
+    @classmethod
+    def register(cls, name: str):
+        """ create the metrics for a view, a number is added to the name, if other views has the same name """
+        key = name
+        number = 1
+        while key in cls._all:
+            number += 1
+            key = f'{name} #{number}'
+        metrics = cls._all[key] = FactoryMetrics(key)
+        return metrics
+
+    @classmethod
+    def unregister(cls, metrics):
+        """ remove the metrics of a destroyed view """
+        cls._all.pop(metrics.name, None)
+
+    @classmethod
+    def get_all(cls) -> list:
+        return list(cls._all.values())
+
+    @classmethod
+    def dump(cls, fn: str):
+        """ write the metrics of all views as json """
+        with open(fn, 'w') as f:
+            json.dump([metrics.to_dict() for metrics in cls.get_all()], f, indent=2)
+
+    def record(self, hook: str, start: float):
+        """ record a callback, started at start (time.perf_counter) """
+        elapsed = time.perf_counter() - start
+        self.counts[hook] += 1
+        self.total[hook] += elapsed
+        self.max[hook] = max(self.max[hook], elapsed)
+        if hook == 'bind':
+            self.bind_histogram[bisect_left(self.buckets, elapsed * 1000000)] += 1
+
+    def record_selection(self):
+        self.selections += 1
+        now = time.monotonic()
+        self._selection_times.append(now)
+        # only keep the last 10 seconds
+        while self._selection_times[0] < now - 10:
+            self._selection_times.pop(0)
+
+    @property
+    def live_rows(self):
+        """ number of row widgets there is setup, but not teardown """
+        return self.counts['setup'] - self.counts['teardown']
+
+    @property
+    def selection_rate(self):
+        """ selection changes per second in the last 10 seconds """
+        now = time.monotonic()
+        return len([t for t in self._selection_times if t >= now - 10]) / 10
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'counts': dict(self.counts),
+            'mean_us': {hook: self.total[hook] / count * 1000000 if count else 0.0
+                        for hook, count in self.counts.items()},
+            'max_us': {hook: value * 1000000 for hook, value in self.max.items()},
+            'bind_histogram_us': dict(zip([f'<{limit}' for limit in self.buckets] + [f'>={self.buckets[-1]}'],
+                                          self.bind_histogram)),
+            'live_rows': self.live_rows,
+            'selections': self.selections,
+            'selection_rate': self.selection_rate,
+        }
+
+
+class WidgetPool:
+    """ Pool of recycled row widgets, shared between list item factories
+
+    Row widget trees are stored by a row template key, so a widget torn down by one
+    view can be reused by the next setup of any view using the same template.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._pool = {}
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return sum(len(widgets) for widgets in self._pool.values())
+
+    def acquire(self, key):
+        """ get a recycled widget for the row template key, None if the pool is empty """
+        widgets = self._pool.get(key)
+        if widgets:
+            self.hits += 1
+            return widgets.pop()
+        self.misses += 1
+        return None
+
+    def release(self, key, widget):
+        """ return a widget to the pool, it is dropped if the pool is full """
+        if widget is None:
+            return
+        if len(self) >= self.max_size:
+            self.dropped += 1
+            return
+        self._pool.setdefault(key, []).append(widget)
+
+    def clear(self):
+        self._pool.clear()
+
+    def stats(self):
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses, 'dropped': self.dropped}
+
+
+# Shared pool used by ListViewBase & ViewColumnBase subclasses with a row_template
+ROW_POOL = WidgetPool()
+
+
+class TextureCache:
+    """ LRU cache of Gdk.Texture, bounded by the size of the textures in bytes """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._textures = OrderedDict()
+
+    def __len__(self):
+        return len(self._textures)
+
+    @staticmethod
+    def texture_size(texture: Gdk.Texture) -> int:
+        return texture.get_width() * texture.get_height() * 4
+
+    def get(self, key):
+        texture = self._textures.get(key)
+        if texture is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._textures.move_to_end(key)
+        return texture
+
+    def put(self, key, texture: Gdk.Texture):
+        if key in self._textures:
+            self.size -= self.texture_size(self._textures.pop(key))
+        self._textures[key] = texture
+        self.size += self.texture_size(texture)
+        # remove the least recently used textures
+        while self.size > self.max_bytes and len(self._textures) > 1:
+            _, old = self._textures.popitem(last=False)
+            self.size -= self.texture_size(old)
+
+    def clear(self):
+        self._textures.clear()
+        self.size = 0
+
+    def stats(self):
+        return {'textures': len(self), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+# Shared thumbnail cache used by GridViewBase
+THUMBNAILS = TextureCache()
+
+
+class IconCache(GObject.GObject):
+    """ Cache of Gtk.IconPaintable looked up in the Gtk.IconTheme
+
+    Each icon is only looked up once per (name, size, scale), and the paintables
+    is shared by all widgets. The cache is cleared when the icon theme or the scale of the
+    monitors is changed, and the changed signal is emitted, so the widgets showing the icons
+    can look them up again (IconImage does it).
+
+    Signals:
+        changed (): emitted when the icon theme or the scale is changed
+    """
+    __gsignals__ = {
+        'changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    def __init__(self):
+        super(IconCache, self).__init__()
+        self.hits = 0
+        self.misses = 0
+        # bumped when the cache is cleared
+        self.generation = 0
+        self._icons = {}
+        self._theme = None
+        self._scale = None
+        self._monitors = None
+        self._monitor_handlers = []
+        self._prefetch = []
+        self._prefetch_id = 0
+
+    def _get_theme(self) -> Gtk.IconTheme:
+        if self._theme is None:
+            self._theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
+            self._theme.connect('changed', self.on_theme_changed)
+        return self._theme
+
+    def get_scale(self) -> int:
+        """ the largest scale factor of the monitors of the default display
+
+        It is cached, and updated when a monitor is added, removed or changes scale
+        """
+        if self._scale is None:
+            if self._monitors is None:
+                self._monitors = Gdk.Display.get_default().get_monitors()
+                self._monitors.connect('items-changed', self.on_monitors_changed)
+            for monitor, handler_id in self._monitor_handlers:
+                monitor.disconnect(handler_id)
+            monitors = list(self._monitors)
+            self._monitor_handlers = [(monitor, monitor.connect('notify::scale-factor', self.on_scale_changed))
+                                      for monitor in monitors]
+            self._scale = max([monitor.get_scale_factor() for monitor in monitors] or [1])
+        return self._scale
+
+    def lookup(self, name: str, size=16, scale=None) -> Gtk.IconPaintable:
+        if scale is None:
+            scale = self.get_scale()
+        key = (name, size, scale)
+        paintable = self._icons.get(key)
+        if paintable is None:
+            self.misses += 1
+            paintable = self._get_theme().lookup_icon(name, None, size, scale,
+                                                      Gtk.TextDirection.NONE, 0)
+            self._icons[key] = paintable
+        else:
+            self.hits += 1
+        return paintable
+
+    def image(self, name: str, size=16) -> 'IconImage':
+        """ Create a Gtk.Image with a cached icon, it is updated when the icons is changed """
+        return IconImage(self, name, size)
+
+    def prefetch(self, names: list, size=16):
+        """ look up the icons, when the main loop is idle """
+        self._prefetch.extend((name, size) for name in names)
+        if not self._prefetch_id:
+            self._prefetch_id = GLib.idle_add(self._on_prefetch, priority=GLib.PRIORITY_LOW)
+
+    def _on_prefetch(self):
+        # one icon per idle call, so the main loop is not blocked
+        if self._prefetch:
+            name, size = self._prefetch.pop(0)
+            self.lookup(name, size)
+        if self._prefetch:
+            return GLib.SOURCE_CONTINUE
+        self._prefetch_id = 0
+        return GLib.SOURCE_REMOVE
+
+    def _invalidate(self):
+        self._icons.clear()
+        self.generation += 1
+        self.emit('changed')
+
+    def on_theme_changed(self, theme):
+        self._invalidate()
+
+    def on_monitors_changed(self, monitors, position, removed, added):
+        self.on_scale_changed(None, None)
+
+    def on_scale_changed(self, monitor, pspec):
+        scale = self._scale
+        self._scale = None
+        if self.get_scale() != scale:
+            self._invalidate()
+
+    def stats(self):
+        return {'icons': len(self._icons), 'hits': self.hits, 'misses': self.misses}
+
+
+class IconImage(Gtk.Image):
+    """ Gtk.Image showing an icon from an IconCache
+
+    The icon is looked up again, when the cache is changed (icon theme or scale), while the
+    image is realized, or when it is realized again, if the cache was changed in the meantime.
+    """
+
+    def __init__(self, cache: IconCache, name: str, size=16):
+        super(IconImage, self).__init__()
+        self.cache = cache
+        self.icon = name
+        self.size = size
+        self._generation = -1
+        self._handler_id = 0
+        self.set_pixel_size(size)
+        self.refresh()
+        self.connect('realize', self._on_realize)
+        self.connect('unrealize', self._on_unrealize)
+
+    def refresh(self, *args):
+        self._generation = self.cache.generation
+        self.set_from_paintable(self.cache.lookup(self.icon, self.size))
+
+    def _on_realize(self, widget):
+        # the cache only refers to the image, while it is realized
+        self._handler_id = self.cache.connect('changed', self.refresh)
+        if self._generation != self.cache.generation:
+            self.refresh()
+
+    def _on_unrealize(self, widget):
+        if self._handler_id:
+            self.cache.disconnect(self._handler_id)
+            self._handler_id = 0
+
+
+# Shared icon cache
+ICONS = IconCache()
+
+
 class MaterialColorDialog(Gtk.ColorChooserDialog):
     """ Color chooser dialog with Material design colors """
 
     def __init__(self, title, parent):
         Gtk.ColorChooserDialog.__init__(self)
+        # the palette is only loaded, when the dialog is used
+        from material import MATERIAL
         self.set_title(title)
         self.set_transient_for(parent)
         self.set_modal(True)
@@ -79,10 +875,21 @@ class ListViewBase(Gtk.ListView):
     """ ListView base class, it setup the basic factory, selection model & data model
     handlers must be overloaded & implemented in a sub class
     """
+    # Set to a hashable key in a subclass to recycle row widgets between views.
+    # All views using the same key must build the same widget tree in factory_setup
+    row_template = None
+    row_pool = ROW_POOL
+    # FactoryMetrics, collecting timing of the factory callbacks (see enable_metrics)
+    metrics = None
+    # item properties shown in the rows, a change of one of them updates the bound rows showing the item
+    watch_properties = ()
 
     def __init__(self, model_cls):
         Gtk.ListView.__init__(self)
         # Use the signal Factory, so we can connect our own methods to setup
+        # bound items with watched properties: Gtk.ListItem -> (item, notify handler id)
+        self._watched = {}
+        self._watch_names = {name.replace('_', '-') for name in self.watch_properties}
         self.factory = Gtk.SignalListItemFactory()
         # connect to Gtk.SignalListItemFactory signals
         # check https://docs.gtk.org/gtk4/class.SignalListItemFactory.html for details
@@ -98,6 +905,17 @@ class ListViewBase(Gtk.ListView):
         self.model.connect('selection-changed', self.on_selection_changed)
         # set the selection model to the view
         self.set_model(self.model)
+        if FactoryMetrics.enabled:
+            self.enable_metrics()
+
+    def enable_metrics(self, name=None):
+        """ collect counts & timings of the factory callbacks, shown on the MetricsPage """
+        self.metrics = FactoryMetrics.register(name or type(self).__name__)
+        self.connect('destroy', self._on_destroy_metrics)
+
+    def _on_destroy_metrics(self, widget):
+        if self.metrics:
+            FactoryMetrics.unregister(self.metrics)
 
     def setup_model(self, store: Gio.ListModel) -> Gtk.SelectionModel:
         """  Setup the selection model to use in Gtk.ListView
@@ -116,6 +934,13 @@ class ListViewBase(Gtk.ListView):
         """ add element to the data model """
         self.store.append(elem)
 
+    def export(self, fn: str, columns: list, row_func=None, selected_only=False) -> 'ModelExporter':
+        """ export the rows shown (or the selected rows) to a CSV, JSON or JSON lines file (.jsonl) in the background
+
+        row_func(item) returns the values of the columns (default is the item attributes with the column names)
+        """
+        return ModelExporter.from_selection(self.model, fn, columns, row_func, selected_only).start()
+
     # Gtk.SignalListItemFactory signal callbacks
     # transfer to some some callback stubs, there can be overloaded in
     # a subclass.
@@ -124,28 +949,63 @@ class ListViewBase(Gtk.ListView):
         """ GtkSignalListItemFactory::setup signal callback
 
         Setup the widgets to go into the ListView """
-
-        self.factory_setup(widget, item)
+        start = time.perf_counter() if self.metrics else 0.0
+        child = None
+        if self.row_template is not None:
+            # reuse a row widget tree from the pool, if there is one
+            child = self.row_pool.acquire(self.row_template)
+        if child is not None:
+            item.set_child(child)
+        else:
+            self.factory_setup(widget, item)
+        if self.metrics:
+            self.metrics.record('setup', start)
 
     def on_factory_bind(self, widget: Gtk.ListView, item: Gtk.ListItem):
         """ GtkSignalListItemFactory::bind signal callback
 
         apply data from model to widgets set in setup"""
+        start = time.perf_counter() if self.metrics else 0.0
         self.factory_bind(widget, item)
+        if self._watch_names:
+            data = item.get_item()
+            self._watched[item] = (data, data.connect('notify', self._on_item_notify, item))
+        if self.metrics:
+            self.metrics.record('bind', start)
 
     def on_factory_unbind(self, widget, item: Gtk.ListItem):
         """ GtkSignalListItemFactory::unbind signal callback
 
         Undo the the binding done in ::bind if needed
         """
+        start = time.perf_counter() if self.metrics else 0.0
+        watched = self._watched.pop(item, None)
+        if watched is not None:
+            watched[0].disconnect(watched[1])
         self.factory_unbind(widget, item)
+        if self.metrics:
+            self.metrics.record('unbind', start)
 
     def on_factory_teardown(self, widget, item: Gtk.ListItem):
         """ GtkSignalListItemFactory::setup signal callback
 
         Undo the creation done in ::setup if needed
         """
+        start = time.perf_counter() if self.metrics else 0.0
         self.factory_teardown(widget, item)
+        if self.row_template is not None:
+            # reset the row widget tree and hand it to the pool
+            child = item.get_child()
+            if child is not None:
+                item.set_child(None)
+                self.factory_reset(child)
+                self.row_pool.release(self.row_template, child)
+        if self.metrics:
+            self.metrics.record('teardown', start)
+
+    def _on_item_notify(self, data, pspec, item: Gtk.ListItem):
+        if pspec.name in self._watch_names:
+            self.factory_update(self, item, pspec.name.replace('-', '_'))
 
     def on_selection_changed(self, widget, position, n_items):
         # get the current selection (GtkBitset)
@@ -153,6 +1013,8 @@ class ListViewBase(Gtk.ListView):
         # the the first value in the GtkBitset, that contain the index of the selection in the data model
         # as we use Gtk.SingleSelection, there can only be one ;-)
         ndx = selection.get_nth(0)
+        if self.metrics:
+            self.metrics.record_selection()
         self.selection_changed(widget, ndx)
 
     # --------------------> abstract callback methods <--------------------------------
@@ -176,6 +1038,17 @@ class ListViewBase(Gtk.ListView):
     def factory_teardown(self, widget: Gtk.ListView, item: Gtk.ListItem):
         pass
 
+    def factory_update(self, widget: Gtk.ListView, item: Gtk.ListItem, name: str):
+        """ a watched property of a bound item is changed, it rebinds the row by default
+        (Overload in subclass to only update the widget showing the property)
+        """
+        self.factory_unbind(widget, item)
+        self.factory_bind(widget, item)
+
+    def factory_reset(self, child: Gtk.Widget):
+        """ reset a row widget tree before it is put back in the row pool (Overload in subclass) """
+        pass
+
     @abstractmethod
     def selection_changed(self, widget, ndx):
         """ trigged when selecting in listview is changed
@@ -196,12 +1069,33 @@ class ListViewListStore(ListViewBase):
         """ Setup the data model """
         return Gio.ListStore.new(model_cls)
 
+    def sync(self, new_items, key=None, changed=None) -> int:
+        """ Update the data model to contain new_items (see sync_store)
+
+        Unlike clearing and adding all rows, the selection & scroll position is kept
+        and only the changed rows is rebound.
+        """
+        selection = self.model if isinstance(self.model, Gtk.SingleSelection) else None
+        return sync_store(self.store, new_items, key, changed, selection)
+
 
 class ListViewStrings(ListViewBase):
-    """ Add ListView with only strings """
+    """ Add ListView with only strings
+
+    In live tail mode (set_live_tail), lines added with append_live are added to the
+    model once per frame, the oldest rows are removed when there is more than max_rows
+    and the view follows the end, unless the user has scrolled up.
+    """
 
     def __init__(self):
         super(ListViewStrings, self).__init__(Gtk.StringObject)
+        self.max_rows = 0
+        self.dropped = 0
+        self.follow = True
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._scheduled = False
+        self._vadjustment = None
 
     def setup_store(self, model_cls) -> Gio.ListModel:
         """ Setup the data model
@@ -209,6 +1103,691 @@ class ListViewStrings(ListViewBase):
         """
         return Gtk.StringList()
 
+    def set_live_tail(self, max_rows=10000):
+        """ Enable live tail mode, with max_rows rows in the model """
+        self.max_rows = max_rows
+        self.connect('notify::vadjustment', self._on_vadjustment_changed)
+        self._on_vadjustment_changed(self, None)
+
+    def append_live(self, line: str):
+        """ Add a line in live tail mode, it can be called from any thread """
+        with self._pending_lock:
+            self._pending.append(line)
+            # don't keep more pending lines than can be shown
+            if self.max_rows and len(self._pending) > self.max_rows * 2:
+                excess = len(self._pending) - self.max_rows
+                del self._pending[:excess]
+                self.dropped += excess
+            if self._scheduled:
+                return
+            self._scheduled = True
+        if threading.current_thread() is threading.main_thread():
+            self._schedule_flush()
+        else:
+            GLib.idle_add(self._schedule_flush)
+
+    def _schedule_flush(self):
+        if self.get_mapped():
+            self.add_tick_callback(self._on_tick)
+        else:
+            self.flush_live()
+        return GLib.SOURCE_REMOVE
+
+    def _on_tick(self, widget, frame_clock):
+        self.flush_live()
+        return GLib.SOURCE_REMOVE
+
+    def flush_live(self):
+        """ add the pending lines to the model, removing the oldest rows if needed """
+        with self._pending_lock:
+            lines = self._pending
+            self._pending = []
+            self._scheduled = False
+        if not lines:
+            return
+        n_items = self.store.get_n_items()
+        if not self.max_rows:
+            self.store.splice(n_items, 0, lines)
+            return
+        dropped = 0
+        if len(lines) > self.max_rows:
+            dropped += len(lines) - self.max_rows
+            lines = lines[-self.max_rows:]
+        remove = n_items + len(lines) - self.max_rows
+        if remove > 0:
+            self.store.splice(0, remove, [])
+            dropped += remove
+            n_items -= remove
+        self.store.splice(n_items, 0, lines)
+        if dropped:
+            # append_live updates dropped from other threads
+            with self._pending_lock:
+                self.dropped += dropped
+
+    def _on_vadjustment_changed(self, widget, pspec):
+        adj = self.get_vadjustment()
+        if adj is None or adj is self._vadjustment:
+            return
+        self._vadjustment = adj
+        adj.connect('changed', self._on_adjustment_changed)
+        adj.connect('value-changed', self._on_adjustment_value_changed)
+
+    def _on_adjustment_changed(self, adj):
+        # the size of the content has changed, scroll to the end, if we are following it
+        if self.max_rows and self.follow:
+            adj.set_value(adj.get_upper() - adj.get_page_size())
+
+    def _on_adjustment_value_changed(self, adj):
+        # pause following the end, when the user has scrolled up
+        self.follow = adj.get_value() >= adj.get_upper() - adj.get_page_size() - 1
+
+
+class ListViewPaged(ListViewBase):
+    """ ListView with infinite scrolling over a PagedListModel
+
+    The pages is fetched as the vertical adjustment of the Gtk.ScrolledWindow nears them,
+    and the rows not fetched yet is shown as a loading row with a spinner.
+    The row widget from factory_setup is wrapped, use get_row_widget(item) in factory_bind
+    to get it. factory_bind is only called for real items.
+    """
+    page_size = 100
+    # evict least recently used pages, when there is more than max_pages (None = keep all)
+    max_pages = None
+
+    def __init__(self, item_type, source):
+        self.source = source
+        self._vadjustment = None
+        super(ListViewPaged, self).__init__(item_type)
+        self.connect('notify::vadjustment', self._on_vadjustment_changed)
+        self._on_vadjustment_changed(self, None)
+
+    def setup_store(self, model_cls) -> Gio.ListModel:
+        """ Setup the data model """
+        return PagedListModel(model_cls, self.source, self.page_size, self.max_pages)
+
+    def set_source(self, source):
+        """ show the items from a new data source (ex. a new query) """
+        self.source = source
+        self.store.set_source(source)
+
+    @staticmethod
+    def get_row_widget(item: Gtk.ListItem) -> Gtk.Widget:
+        """ get the widget created in factory_setup """
+        return item.get_child().get_first_child()
+
+    def _on_vadjustment_changed(self, widget, pspec):
+        adj = self.get_vadjustment()
+        if adj is None or adj is self._vadjustment:
+            return
+        self._vadjustment = adj
+        adj.connect('changed', self._on_scrolled)
+        adj.connect('value-changed', self._on_scrolled)
+
+    def _on_scrolled(self, adj):
+        upper = adj.get_upper()
+        n_items = self.store.get_n_items()
+        if upper <= 0 or not n_items:
+            return
+        # rows has the same height (almost), so the visible rows can be found from the adjustment
+        first = int(n_items * adj.get_value() / upper)
+        last = int(n_items * (adj.get_value() + adj.get_page_size()) / upper)
+        self.store.set_visible_range(first, min(last, n_items - 1))
+
+    def on_factory_setup(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::setup signal callback
+
+        wrap the row widget in a box with the loading row widgets"""
+        super(ListViewPaged, self).on_factory_setup(widget, item)
+        child = item.get_child()
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        item.set_child(box)
+        box.append(child)
+        loading = Gtk.Box(spacing=6)
+        loading.set_margin_start(10)
+        loading.append(Gtk.Spinner())
+        loading.append(Gtk.Label(label='Loading...'))
+        box.append(loading)
+
+    def on_factory_bind(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::bind signal callback """
+        child = self.get_row_widget(item)
+        loading = child.get_next_sibling()
+        is_loading = isinstance(item.get_item(), LoadingRow)
+        child.set_visible(not is_loading)
+        loading.set_visible(is_loading)
+        if is_loading:
+            loading.get_first_child().start()
+            # make sure the page is fetched, also without a scrolled window
+            self.store.request(item.get_position() // self.store.page_size)
+        else:
+            super(ListViewPaged, self).on_factory_bind(widget, item)
+
+    def on_factory_unbind(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::unbind signal callback """
+        if isinstance(item.get_item(), LoadingRow):
+            self.get_row_widget(item).get_next_sibling().get_first_child().stop()
+        else:
+            super(ListViewPaged, self).on_factory_unbind(widget, item)
+
+    def on_factory_teardown(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::teardown signal callback
+
+        unwrap the row widget, so it can go back to the row pool"""
+        box = item.get_child()
+        if box is not None:
+            child = box.get_first_child()
+            box.remove(child)
+            item.set_child(child)
+        super(ListViewPaged, self).on_factory_teardown(widget, item)
+
+
+class GridViewBase(Gtk.GridView):
+    """ GridView base class, it setup the basic factory, selection model & data model
+    handlers must be overloaded & implemented in a sub class
+
+    Use load_texture in factory_bind, to show a thumbnail in a Gtk.Picture, the
+    thumbnail is decoded in a worker thread and kept in the texture_cache.
+    Loads for rows there is unbound (scrolled out of view) before they are started is cancelled.
+    """
+    thumbnail_size = 128
+    texture_cache = THUMBNAILS
+
+    def __init__(self, model_cls):
+        Gtk.GridView.__init__(self)
+        # pending thumbnail loads: Gtk.ListItem -> (key, Gtk.Picture, Future)
+        self._pending = {}
+        # Use the signal Factory, so we can connect our own methods to setup
+        self.factory = Gtk.SignalListItemFactory()
+        self.factory.connect('setup', self.on_factory_setup)
+        self.factory.connect('bind', self.on_factory_bind)
+        self.factory.connect('unbind', self.on_factory_unbind)
+        self.factory.connect('teardown', self.on_factory_teardown)
+        self.set_factory(self.factory)
+        self.store = self.setup_store(model_cls)
+        # create a selection model containing our data model
+        self.model = self.setup_model(self.store)
+        self.model.connect('selection-changed', self.on_selection_changed)
+        self.set_model(self.model)
+
+    def setup_model(self, store: Gio.ListModel) -> Gtk.SelectionModel:
+        """  Setup the selection model to use in Gtk.GridView
+        Can be overloaded in subclass to use another Gtk.SelectModel model
+        """
+        return Gtk.SingleSelection.new(store)
+
+    def setup_store(self, model_cls) -> Gio.ListModel:
+        """ Setup the data model
+        Can be overloaded in subclass to use another Gio.ListModel
+        """
+        return Gio.ListStore.new(model_cls)
+
+    def add(self, elem):
+        """ add element to the data model """
+        self.store.append(elem)
+
+    def load_texture(self, item: Gtk.ListItem, key, picture: Gtk.Picture):
+        """ Show the thumbnail for key in picture
+
+        The thumbnail is taken from the texture_cache or decoded by decode_texture in a worker thread
+        """
+        self.cancel_texture(item)
+        texture = self.texture_cache.get(key)
+        picture.set_paintable(texture)
+        if texture is None:
+            future = run_in_worker(self.decode_texture, lambda result: self._on_texture_decoded(item, key, result), key)
+            self._pending[item] = (key, picture, future)
+
+    def cancel_texture(self, item: Gtk.ListItem):
+        """ cancel a pending thumbnail load for item """
+        pending = self._pending.pop(item, None)
+        if pending:
+            pending[2].cancel()
+
+    def _on_texture_decoded(self, item, key, texture):
+        if texture is not None:
+            self.texture_cache.put(key, texture)
+        pending = self._pending.get(item)
+        # only show it, if the item still shows the same key
+        if pending and pending[0] == key:
+            del self._pending[item]
+            pending[1].set_paintable(texture)
+
+    def decode_texture(self, key) -> Gdk.Texture:
+        """ Decode the thumbnail for key, it is called in a worker thread
+        key is a filename by default, overload in subclass to load thumbnails from somewhere else
+        """
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(key, self.thumbnail_size, self.thumbnail_size, True)
+        except GLib.Error as e:
+            print(f"Error loading thumbnail : {e} ")
+            return None
+        return Gdk.Texture.new_for_pixbuf(pixbuf)
+
+    # Gtk.SignalListItemFactory signal callbacks
+
+    def on_factory_setup(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::setup signal callback """
+        self.factory_setup(widget, item)
+
+    def on_factory_bind(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::bind signal callback """
+        self.factory_bind(widget, item)
+
+    def on_factory_unbind(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::unbind signal callback """
+        self.cancel_texture(item)
+        self.factory_unbind(widget, item)
+
+    def on_factory_teardown(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::teardown signal callback """
+        self.factory_teardown(widget, item)
+
+    def on_selection_changed(self, widget, position, n_items):
+        selection = widget.get_selection()
+        ndx = selection.get_nth(0)
+        self.selection_changed(widget, ndx)
+
+    # --------------------> abstract callback methods <--------------------------------
+    # Implement these methods in your subclass
+
+    @abstractmethod
+    def factory_setup(self, widget: Gtk.GridView, item: Gtk.ListItem):
+        """ Setup the widgets to go into the GridView (Overload in subclass) """
+        pass
+
+    @abstractmethod
+    def factory_bind(self, widget: Gtk.GridView, item: Gtk.ListItem):
+        """ apply data from model to widgets set in setup (Overload in subclass)"""
+        pass
+
+    @abstractmethod
+    def factory_unbind(self, widget: Gtk.GridView, item: Gtk.ListItem):
+        pass
+
+    @abstractmethod
+    def factory_teardown(self, widget: Gtk.GridView, item: Gtk.ListItem):
+        pass
+
+    @abstractmethod
+    def selection_changed(self, widget, ndx):
+        """ trigged when selecting in gridview is changed
+        ndx: is the index in the data store model that is selected
+        """
+        pass
+
+
+class LazyListModel(GObject.GObject, Gio.ListModel):
+    """ Gio.ListModel where the items are loaded the first time the model is used
+
+    loader: function returning the items (a list), it is called in a worker thread
+    if async_load is True, else the items is loaded the first time the size is read
+    """
+
+    def __init__(self, item_type, loader, async_load=False):
+        super(LazyListModel, self).__init__()
+        self.item_type = item_type
+        self.loader = loader
+        self.async_load = async_load
+        self.loading = False
+        self._items = None
+
+    def do_get_item_type(self):
+        return self.item_type.__gtype__
+
+    def do_get_n_items(self):
+        if self._items is None:
+            self.load()
+            if self._items is None:
+                return 0
+        return len(self._items)
+
+    def do_get_item(self, position):
+        if self._items is None or position >= len(self._items):
+            return None
+        return self._items[position]
+
+    def load(self):
+        """ load the items, if they are not loaded or loading """
+        if self._items is not None or self.loading:
+            return
+        if self.async_load:
+            self.loading = True
+            run_in_worker(self.loader, self._on_loaded)
+        else:
+            self._items = list(self.loader())
+
+    def _on_loaded(self, items):
+        self.loading = False
+        self._items = list(items)
+        self.items_changed(0, 0, len(self._items))
+
+
+class LoadingRow(GObject.GObject):
+    """ placeholder item for rows there is being fetched by a PagedListModel """
+
+
+class PagedListModel(GObject.GObject, Gio.ListModel):
+    """ Gio.ListModel there is filled with pages of items from a data source, when they are needed
+
+    source can be:
+     * a function fetch(offset, limit) returning a list of items, it is called in a worker thread
+     * an iterator or an async iterator of items (async iterators run in a shared asyncio loop thread)
+    A page with less than page_size items ends the data. Until then, the model ends with a LoadingRow.
+    set_visible_range() fetches the visible pages and one page ahead, cancels the fetches there is not
+    needed anymore (only for a fetch function) and a page is never fetched twice at the same time.
+    If max_pages is set, the least recently used pages is evicted (only for a fetch function),
+    so a large result set is never kept in memory, evicted rows is shown as LoadingRow until refetched.
+    """
+
+    def __init__(self, item_type, source, page_size=100, max_pages=None):
+        super(PagedListModel, self).__init__()
+        self.item_type = item_type
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.loading_row = LoadingRow()
+        self._pages = OrderedDict()
+        self._pending = {}
+        self._visible = (0, 0)
+        self._n_rows = 0
+        self.at_end = False
+        self.set_source(source)
+
+    def set_source(self, source):
+        """ show the items from a new data source (ex. a new query) """
+        old_size = self.get_n_items()
+        for future in self._pending.values():
+            future.cancel()
+        self.source = source
+        self.sequential = not callable(source)
+        self._pages.clear()
+        self._pending = {}
+        self._visible = (0, 0)
+        self._n_rows = 0
+        self.at_end = False
+        self.items_changed(0, old_size, self.get_n_items())
+        self.request(0)
+
+    def do_get_item_type(self):
+        # the items is item_type or LoadingRow
+        return GObject.Object.__gtype__
+
+    def do_get_n_items(self):
+        return self._n_rows if self.at_end else self._n_rows + 1
+
+    def do_get_item(self, position):
+        if position >= self.get_n_items():
+            return None
+        page = position // self.page_size
+        items = self._pages.get(page)
+        if items is None:
+            return self.loading_row
+        self._pages.move_to_end(page)
+        return items[position % self.page_size]
+
+    @property
+    def loading(self) -> bool:
+        return bool(self._pending)
+
+    def set_visible_range(self, first: int, last: int):
+        """ fetch the pages of the visible rows and the page after them, cancel the fetches of other pages """
+        self._visible = (first, last)
+        wanted = range(first // self.page_size, last // self.page_size + 2)
+        if not self.sequential:
+            for page in [page for page in self._pending if page not in wanted]:
+                self._pending.pop(page).cancel()
+        for page in wanted:
+            self.request(page)
+
+    def request(self, page: int):
+        """ fetch a page, if it is not loaded or being fetched """
+        if page in self._pages or page in self._pending:
+            return
+        next_page = self._n_rows // self.page_size
+        # new pages is only added at the end, one at a time
+        if page > next_page or (page == next_page and self.at_end):
+            return
+        if self.sequential and (page != next_page or self._pending):
+            return
+        future = None
+
+        def on_fetched(items):
+            self._on_fetched(page, future, items)
+
+        if not self.sequential:
+            future = run_in_worker(self._fetch, on_fetched, page)
+        elif hasattr(self.source, '__anext__'):
+            future = run_in_async_loop(self._fetch_async(self.source), on_fetched)
+        else:
+            future = run_in_worker(self._fetch_iter, on_fetched, self.source)
+        self._pending[page] = future
+
+    def _fetch(self, page):
+        try:
+            return list(self.source(page * self.page_size, self.page_size))
+        except Exception as e:
+            print(f"Error fetching page {page} : {e}")
+            return None
+
+    def _fetch_iter(self, source):
+        try:
+            return [item for _, item in zip(range(self.page_size), source)]
+        except Exception as e:
+            print(f"Error fetching page : {e}")
+            return None
+
+    async def _fetch_async(self, source):
+        items = []
+        try:
+            async for item in source:
+                items.append(item)
+                if len(items) == self.page_size:
+                    break
+        except Exception as e:
+            print(f"Error fetching page : {e}")
+            return None
+        return items
+
+    def _on_fetched(self, page, future, items):
+        if self._pending.get(page) is not future:
+            # cancelled or from an old source
+            return
+        del self._pending[page]
+        if items is None:
+            return
+        self._pages[page] = items
+        start = page * self.page_size
+        if start >= self._n_rows:
+            # a new page at the end, replacing the loading row
+            self._n_rows += len(items)
+            self.at_end = len(items) < self.page_size
+            self.items_changed(start, 1, len(items) + (0 if self.at_end else 1))
+        else:
+            self.items_changed(start, len(items), len(items))
+        self._evict()
+        # keep fetching, until the visible rows & one page ahead is loaded
+        self.set_visible_range(*self._visible)
+
+    def _evict(self):
+        if self.sequential or not self.max_pages:
+            return
+        first, last = self._visible
+        visible = range(first // self.page_size, last // self.page_size + 2)
+        for page in list(self._pages):
+            if len(self._pages) <= self.max_pages:
+                break
+            if page not in visible:
+                items = self._pages.pop(page)
+                self.items_changed(page * self.page_size, len(items), len(items))
+
+
+class TreeListViewBase(Gtk.ListView):
+    """ ListView for hierarchical data, using a Gtk.TreeListModel
+
+    The children of a node is loaded by get_children, when the node is expanded
+    (in a worker thread, if async_load is True). Gtk.TreeListModel frees the children
+    of collapsed nodes, the loaded children are kept in a cache with max cache_size nodes,
+    so expanding a node again don't load the children again, use evict() to free them.
+
+    The rows are wrapped in a Gtk.TreeExpander, so in factory_bind use get_row_widget(item)
+    to get the widget created in factory_setup and get_row_data(item) to get the data element.
+    In selection_changed use get_item(ndx) to get the data element.
+    """
+    cache_size = 1000
+
+    def __init__(self, model_cls, async_load=False):
+        Gtk.ListView.__init__(self)
+        self.model_cls = model_cls
+        self.async_load = async_load
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Use the signal Factory, so we can connect our own methods to setup
+        self.factory = Gtk.SignalListItemFactory()
+        self.factory.connect('setup', self.on_factory_setup)
+        self.factory.connect('bind', self.on_factory_bind)
+        self.factory.connect('unbind', self.on_factory_unbind)
+        self.factory.connect('teardown', self.on_factory_teardown)
+        self.set_factory(self.factory)
+        # data model with the top level nodes
+        self.store = self.setup_store(model_cls)
+        # tree model, creating the child models when nodes are expanded
+        self.tree = Gtk.TreeListModel.new(self.store, False, False, self._create_child_model)
+        # create a selection model containing our tree model
+        self.model = self.setup_model(self.tree)
+        self.model.connect('selection-changed', self.on_selection_changed)
+        self.set_model(self.model)
+
+    def setup_model(self, store: Gio.ListModel) -> Gtk.SelectionModel:
+        """  Setup the selection model to use in Gtk.ListView
+        Can be overloaded in subclass to use another Gtk.SelectModel model
+        """
+        return Gtk.SingleSelection.new(store)
+
+    def setup_store(self, model_cls) -> Gio.ListModel:
+        """ Setup the data model for the top level nodes """
+        return Gio.ListStore.new(model_cls)
+
+    def add(self, elem):
+        """ add top level element to the data model """
+        self.store.append(elem)
+
+    def get_item(self, ndx):
+        """ get the data element at ndx in the (expanded) tree """
+        row = self.tree.get_row(ndx)
+        return row.get_item() if row else None
+
+    @staticmethod
+    def get_row_widget(item: Gtk.ListItem) -> Gtk.Widget:
+        """ get the widget created in factory_setup """
+        return item.get_child().get_child()
+
+    @staticmethod
+    def get_row_data(item: Gtk.ListItem):
+        """ get the data element for a Gtk.ListItem """
+        return item.get_item().get_item()
+
+    def evict(self, elem=None):
+        """ remove the cached children of elem (all if elem is None) """
+        with self._cache_lock:
+            if elem is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(self.get_key(elem), None)
+
+    def _create_child_model(self, elem):
+        # Gtk.TreeListModel also calls this to check if a node can be expanded, so the
+        # children is not loaded before the model is used.
+        if not self.has_children(elem):
+            return None
+        return LazyListModel(self.model_cls, lambda: self._load_children(elem), self.async_load)
+
+    def _load_children(self, elem):
+        key = self.get_key(elem)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        children = list(self.get_children(elem))
+        with self._cache_lock:
+            self._cache[key] = children
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return children
+
+    # Gtk.SignalListItemFactory signal callbacks
+
+    def on_factory_setup(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::setup signal callback
+
+        Setup the widgets to go into the ListView, wrapped in a Gtk.TreeExpander """
+        self.factory_setup(widget, item)
+        expander = Gtk.TreeExpander()
+        expander.set_child(item.get_child())
+        item.set_child(expander)
+
+    def on_factory_bind(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::bind signal callback
+
+        apply data from model to widgets set in setup"""
+        item.get_child().set_list_row(item.get_item())
+        self.factory_bind(widget, item)
+
+    def on_factory_unbind(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::unbind signal callback """
+        self.factory_unbind(widget, item)
+        item.get_child().set_list_row(None)
+
+    def on_factory_teardown(self, widget, item: Gtk.ListItem):
+        """ GtkSignalListItemFactory::teardown signal callback """
+        self.factory_teardown(widget, item)
+
+    def on_selection_changed(self, widget, position, n_items):
+        selection = widget.get_selection()
+        ndx = selection.get_nth(0)
+        self.selection_changed(widget, ndx)
+
+    # --------------------> abstract callback methods <--------------------------------
+    # Implement these methods in your subclass
+
+    def get_key(self, elem):
+        """ key used for elem in the children cache (Overload in subclass if elem is not unique) """
+        return elem
+
+    def has_children(self, elem) -> bool:
+        """ return True if elem can have children, it must be fast (Overload in subclass) """
+        return True
+
+    @abstractmethod
+    def get_children(self, elem) -> list:
+        """ return the children of elem (Overload in subclass)
+        it is called in a worker thread if async_load is True
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def factory_setup(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        """ Setup the widgets to go into the ListView (Overload in subclass) """
+        pass
+
+    @abstractmethod
+    def factory_bind(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        """ apply data from model to widgets set in setup (Overload in subclass)"""
+        pass
+
+    @abstractmethod
+    def factory_unbind(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        pass
+
+    @abstractmethod
+    def factory_teardown(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        pass
+
+    @abstractmethod
+    def selection_changed(self, widget, ndx):
+        """ trigged when selecting in listview is changed
+        ndx: is the index in the tree model that is selected
+        """
+        pass
+
 
 class SelectorBase(Gtk.ListBox):
     """ Selector base class """
@@ -264,8 +1843,8 @@ class IconSelector(SelectorBase):
 
     def add_row(self, name, icon_name):
         """ Add a named row to the selector with at given icon name"""
-        # get the image
-        pix = Gtk.Image.new_from_icon_name(icon_name)
+        # get the image (shared with other widgets using the same icon)
+        pix = ICONS.image(icon_name)
         # set the widget size request to 32x32 px, so we get some margins
         pix.set_size_request(32, 32)
         row = self.append(pix)
@@ -278,11 +1857,22 @@ class ViewColumnBase(Gtk.ColumnViewColumn):
     """ ColumnViewColumn base class, it setup the basic factory, selection model & data model
     handlers must be overloaded & implemented in a sub class
     """
+    # Set to a hashable key in a subclass to recycle row widgets between views.
+    # All views using the same key must build the same widget tree in factory_setup
+    row_template = None
+    row_pool = ROW_POOL
+    # FactoryMetrics, collecting timing of the factory callbacks (see enable_metrics)
+    metrics = None
+    # item properties shown in the rows, a change of one of them updates the bound rows showing the item
+    watch_properties = ()
 
     def __init__(self, model_cls, col_view):
         Gtk.ColumnViewColumn.__init__(self)
         self.col_view = col_view
         # Use the signal Factory, so we can connect our own methods to setup
+        # bound items with watched properties: Gtk.ListItem -> (item, notify handler id)
+        self._watched = {}
+        self._watch_names = {name.replace('_', '-') for name in self.watch_properties}
         self.factory = Gtk.SignalListItemFactory()
         # connect to Gtk.SignalListItemFactory signals
         # check https://docs.gtk.org/gtk4/class.SignalListItemFactory.html for details
@@ -298,11 +1888,22 @@ class ViewColumnBase(Gtk.ColumnViewColumn):
         self.model.connect('selection-changed', self.on_selection_changed)
         # add model to the ColumnView
         self.col_view.set_model(self.model)
+        if FactoryMetrics.enabled:
+            self.enable_metrics()
+
+    def enable_metrics(self, name=None):
+        """ collect counts & timings of the factory callbacks, shown on the MetricsPage """
+        # a column is not a widget (no destroy signal), the metrics is removed when it is freed
+        self.metrics = FactoryMetrics.register(name or type(self).__name__)
 
     def setup_model(self, store: Gio.ListModel) -> Gtk.SelectionModel:
         """  Setup the selection model to use in Gtk.ListView
         Can be overloaded in subclass to use another Gtk.SelectModel model
+        Columns sharing the same data model, share the selection model of the ColumnView
         """
+        model = self.col_view.get_model()
+        if model is not None and model.get_model() is store:
+            return model
         return Gtk.SingleSelection.new(store)
 
     @abstractmethod
@@ -316,6 +1917,13 @@ class ViewColumnBase(Gtk.ColumnViewColumn):
         """ add element to the data model """
         self.store.append(elem)
 
+    def export(self, fn: str, columns: list, row_func=None, selected_only=False) -> 'ModelExporter':
+        """ export the rows shown (or the selected rows) to a CSV, JSON or JSON lines file (.jsonl) in the background
+
+        row_func(item) returns the values of the columns (default is the item attributes with the column names)
+        """
+        return ModelExporter.from_selection(self.model, fn, columns, row_func, selected_only).start()
+
     # Gtk.SignalListItemFactory signal callbacks
     # transfer to some some callback stubs, there can be overloaded in
     # a subclass.
@@ -324,28 +1932,63 @@ class ViewColumnBase(Gtk.ColumnViewColumn):
         """ GtkSignalListItemFactory::setup signal callback
 
         Setup the widgets to go into the ListView """
-
-        self.factory_setup(widget, item)
+        start = time.perf_counter() if self.metrics else 0.0
+        child = None
+        if self.row_template is not None:
+            # reuse a row widget tree from the pool, if there is one
+            child = self.row_pool.acquire(self.row_template)
+        if child is not None:
+            item.set_child(child)
+        else:
+            self.factory_setup(widget, item)
+        if self.metrics:
+            self.metrics.record('setup', start)
 
     def on_factory_bind(self, widget: Gtk.ListView, item: Gtk.ListItem):
         """ GtkSignalListItemFactory::bind signal callback
 
         apply data from model to widgets set in setup"""
+        start = time.perf_counter() if self.metrics else 0.0
         self.factory_bind(widget, item)
+        if self._watch_names:
+            data = item.get_item()
+            self._watched[item] = (data, data.connect('notify', self._on_item_notify, item))
+        if self.metrics:
+            self.metrics.record('bind', start)
 
     def on_factory_unbind(self, widget, item: Gtk.ListItem):
         """ GtkSignalListItemFactory::unbind signal callback
 
         Undo the the binding done in ::bind if needed
         """
+        start = time.perf_counter() if self.metrics else 0.0
+        watched = self._watched.pop(item, None)
+        if watched is not None:
+            watched[0].disconnect(watched[1])
         self.factory_unbind(widget, item)
+        if self.metrics:
+            self.metrics.record('unbind', start)
 
     def on_factory_teardown(self, widget, item: Gtk.ListItem):
         """ GtkSignalListItemFactory::setup signal callback
 
         Undo the creation done in ::setup if needed
         """
+        start = time.perf_counter() if self.metrics else 0.0
         self.factory_teardown(widget, item)
+        if self.row_template is not None:
+            # reset the row widget tree and hand it to the pool
+            child = item.get_child()
+            if child is not None:
+                item.set_child(None)
+                self.factory_reset(child)
+                self.row_pool.release(self.row_template, child)
+        if self.metrics:
+            self.metrics.record('teardown', start)
+
+    def _on_item_notify(self, data, pspec, item: Gtk.ListItem):
+        if pspec.name in self._watch_names:
+            self.factory_update(self, item, pspec.name.replace('-', '_'))
 
     def on_selection_changed(self, widget, position, n_items):
         # get the current selection (GtkBitset)
@@ -353,6 +1996,8 @@ class ViewColumnBase(Gtk.ColumnViewColumn):
         # the the first value in the GtkBitset, that contain the index of the selection in the data model
         # as we use Gtk.SingleSelection, there can only be one ;-)
         ndx = selection.get_nth(0)
+        if self.metrics:
+            self.metrics.record_selection()
         self.selection_changed(widget, ndx)
 
     # --------------------> abstract callback methods <--------------------------------
@@ -376,6 +2021,17 @@ class ViewColumnBase(Gtk.ColumnViewColumn):
     def factory_teardown(self, widget: Gtk.ColumnViewColumn, item: Gtk.ListItem):
         pass
 
+    def factory_update(self, widget: Gtk.ColumnViewColumn, item: Gtk.ListItem, name: str):
+        """ a watched property of a bound item is changed, it rebinds the row by default
+        (Overload in subclass to only update the widget showing the property)
+        """
+        self.factory_unbind(widget, item)
+        self.factory_bind(widget, item)
+
+    def factory_reset(self, child: Gtk.Widget):
+        """ reset a row widget tree before it is put back in the row pool (Overload in subclass) """
+        pass
+
     @abstractmethod
     def selection_changed(self, widget, ndx):
         """ trigged when selecting in listview is changed
@@ -396,6 +2052,655 @@ class ColumnViewListStore(ViewColumnBase):
         """ Setup the data model """
         return Gio.ListStore.new(model_cls)
 
+    def sync(self, new_items, key=None, changed=None) -> int:
+        """ Update the data model to contain new_items (see sync_store)
+
+        Unlike clearing and adding all rows, the selection & scroll position is kept
+        and only the changed rows is rebound.
+        """
+        selection = self.model if isinstance(self.model, Gtk.SingleSelection) else None
+        return sync_store(self.store, new_items, key, changed, selection)
+
+
+class TextLoader(GObject.GObject):
+    """ Load a (large) text file into a Gtk.TextView
+
+    The file is memory mapped and decoded incrementally, the text is inserted in chunks
+    from an idle callback, using max frame_budget seconds per call, so the UI is not blocked.
+    If follow is True, new text is appended when the file grows (checked every poll_interval ms)
+    and the view is scrolled to the end.
+
+    Signals:
+        progress (fraction): emitted after each chunk of the initial load
+        done (cancelled): emitted when the initial load is completed or cancelled
+    """
+    __gsignals__ = {
+        'progress': (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+        'done': (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+    }
+    chunk_size = 256 * 1024
+    frame_budget = 0.008
+
+    def __init__(self, view: Gtk.TextView, fn: str, follow=False, poll_interval=500, encoding='utf-8'):
+        super(TextLoader, self).__init__()
+        self.view = view
+        self.buffer = view.get_buffer()
+        self.fn = fn
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self.offset = 0
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._file = None
+        self._mmap = None
+        self._source_id = 0
+        self._end_mark = None
+
+    def start(self):
+        """ clear the buffer and start loading the file """
+        # a restart is not a cancel, so done is not emitted for the last load
+        self._stop()
+        self._decoder.reset()
+        self.buffer.set_text('')
+        self._end_mark = self.buffer.create_mark(None, self.buffer.get_end_iter(), False)
+        self._file = open(self.fn, 'rb')
+        self.offset = 0
+        self.size = os.fstat(self._file.fileno()).st_size
+        # an empty file can't be memory mapped
+        if self.size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._source_id = GLib.idle_add(self._on_idle)
+
+    def cancel(self):
+        """ stop loading (and following) the file """
+        loading = self._mmap is not None
+        self._stop()
+        if loading:
+            self.emit('done', True)
+
+    def _stop(self):
+        if self._source_id:
+            GLib.source_remove(self._source_id)
+            self._source_id = 0
+        self._close()
+
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, data: bytes, final=False):
+        text = self._decoder.decode(data, final)
+        if text:
+            self.buffer.insert(self.buffer.get_end_iter(), text)
+
+    def _on_idle(self):
+        deadline = time.monotonic() + self.frame_budget
+        while self.offset < self.size and time.monotonic() < deadline:
+            end = min(self.offset + self.chunk_size, self.size)
+            self._append(self._mmap[self.offset:end])
+            self.offset = end
+        if self.offset < self.size:
+            self.emit('progress', self.offset / self.size)
+            return GLib.SOURCE_CONTINUE
+        # initial load is completed
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if not self.follow:
+            # the file is complete, so an incomplete multibyte sequence at the end is decoded as U+FFFD
+            self._append(b'', final=True)
+        self.emit('progress', 1.0)
+        self.emit('done', False)
+        if self.follow:
+            self.view.scroll_mark_onscreen(self._end_mark)
+            self._source_id = GLib.timeout_add(self.poll_interval, self._on_poll)
+        else:
+            self._source_id = 0
+            self._close()
+        return GLib.SOURCE_REMOVE
+
+    def _on_poll(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.offset:
+            # file is truncated, load it again from the start
+            self.offset = 0
+            self._decoder.reset()
+            self.buffer.set_text('')
+        if size > self.offset:
+            self._file.seek(self.offset)
+            data = self._file.read(min(size - self.offset, self.chunk_size))
+            self.offset += len(data)
+            self._append(data)
+            self.view.scroll_mark_onscreen(self._end_mark)
+        return GLib.SOURCE_CONTINUE
+
+
+class ModelExporter(GObject.GObject):
+    """ Export the rows of a Gio.ListModel to a CSV, JSON or JSON lines (.jsonl) file, without blocking the UI
+
+    The rows is exported as they was when the export is started, changes to the model while it runs
+    is not in the file:
+     * Models with a snapshot() method (ex. ColumnarListModel) gives an unchangeable copy, there is
+       read by get_row(position) in the writer thread.
+     * Other models with a get_row(position) method (ex. SQLiteListModel) is read without creating
+       the items. The export fails if rows in the exported range is changed while it runs
+       (rows added after it is ignored).
+     * For other models the items is collected, when the export is started, and
+       row_func(item) is called for them, so rows added, removed or moved after the start don't matter.
+       row_func must return the values of the columns (default is the item attributes or properties
+       with the column names).
+    Rows read in the main thread is read in chunks from an idle callback, using max frame_budget seconds
+    per call, and copied to tuples. The file is written by a writer thread (its own, so it don't hold a
+    run_in_worker thread while the export runs) through a buffered writer, to a temporary file there is
+    renamed when it is completed.
+
+    Signals:
+        progress (fraction): emitted while the rows is written
+        done (cancelled): emitted when the export is completed, cancelled or failed (see error)
+    """
+    __gsignals__ = {
+        'progress': (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+        'done': (GObject.SignalFlags.RUN_FIRST, None, (bool,)),
+    }
+    chunk_rows = 1000
+    frame_budget = 0.008
+    buffer_size = 1024 * 1024
+    # max chunks read ahead of the writer
+    max_pending = 32
+
+    def __init__(self, model: Gio.ListModel, fn: str, columns: list, row_func=None, positions=None, fmt=None):
+        super(ModelExporter, self).__init__()
+        # a selection model show the rows of its model, read them directly if it is faster
+        inner = model.get_model() if isinstance(model, Gtk.SelectionModel) else None
+        self.model = inner if inner is not None and hasattr(inner, 'get_row') else model
+        self.fn = fn
+        self.columns = columns
+        self.row_func = row_func or self._get_values
+        self.positions = positions
+        if fmt is None:
+            fmt = 'jsonl' if fn.endswith('.jsonl') else 'json' if fn.endswith('.json') else 'csv'
+        self.fmt = fmt
+        self.total = 0
+        self.read = 0
+        self.written = 0
+        self.error = None
+        self.running = False
+        self._queue = queue.Queue()
+        self._cancelled = False
+        self._source_id = 0
+        self._handler_id = 0
+        self._last_progress = 0.0
+        # the positions or items to read in the main thread
+        self._rows = None
+        # end of the exported range of a get_row model
+        self._end = 0
+
+    @classmethod
+    def from_selection(cls, selection: Gtk.SelectionModel, fn: str, columns: list, row_func=None,
+                       selected_only=False, fmt=None):
+        """ exporter for the rows shown in a view (filtered & sorted), or the selected rows """
+        positions = None
+        if selected_only:
+            bitset = selection.get_selection()
+            positions = [bitset.get_nth(ndx) for ndx in range(bitset.get_size())]
+        return cls(selection, fn, columns, row_func, positions, fmt)
+
+    def _get_values(self, item) -> tuple:
+        return tuple(getattr(item, column) if hasattr(item, column) else item.get_property(column)
+                     for column in self.columns)
+
+    def start(self):
+        """ start the export in the background """
+        positions = range(self.model.get_n_items()) if self.positions is None else self.positions
+        self.total = len(positions)
+        self.running = True
+        snapshot = getattr(self.model, 'snapshot', None)
+        if snapshot is not None:
+            chunks = self._read_snapshot(snapshot(), positions)
+        else:
+            if hasattr(self.model, 'get_row'):
+                self._rows = positions
+                self._end = max(positions, default=-1) + 1
+                self._handler_id = self.model.connect('items-changed', self._on_items_changed)
+            else:
+                get_item = self.model.get_item
+                self._rows = [get_item(pos) for pos in positions]
+            self._source_id = GLib.idle_add(self._on_idle)
+            chunks = iter(self._queue.get, None)
+        threading.Thread(target=self._run_writer, args=(chunks,), name='ModelExporter', daemon=True).start()
+        return self
+
+    def cancel(self):
+        """ stop the export, the file is not written """
+        if self.running and not self._cancelled:
+            self._cancelled = True
+            self._stop_reading()
+            # wake up the writer
+            self._queue.put(None)
+
+    def _stop_reading(self):
+        if self._source_id:
+            GLib.source_remove(self._source_id)
+            self._source_id = 0
+        if self._handler_id:
+            self.model.disconnect(self._handler_id)
+            self._handler_id = 0
+        self._rows = None
+
+    def _on_items_changed(self, model, position, removed, added):
+        if position < self._end:
+            self.error = 'the rows was changed while they was exported'
+            self.cancel()
+
+    def _read_snapshot(self, model, positions):
+        """ read the rows of a snapshot in chunks, runs in the writer thread """
+        columns = self.columns
+        for start in range(0, len(positions), self.chunk_rows):
+            if self._cancelled:
+                return
+            yield [tuple(values.get(column) for column in columns)
+                   for values in map(model.get_row, positions[start:start + self.chunk_rows])]
+
+    def _on_idle(self):
+        if self._cancelled:
+            self._source_id = 0
+            self._stop_reading()
+            return GLib.SOURCE_REMOVE
+        if self._queue.qsize() >= self.max_pending:
+            # the writer is behind, check again later
+            self._source_id = GLib.timeout_add(20, self._on_resume)
+            return GLib.SOURCE_REMOVE
+        try:
+            self._read_chunks()
+        except Exception as e:
+            self.error = f'reading the rows failed : {e}'
+            self._source_id = 0
+            self.cancel()
+            return GLib.SOURCE_REMOVE
+        if self.read < self.total:
+            return GLib.SOURCE_CONTINUE
+        self._source_id = 0
+        self._stop_reading()
+        self._queue.put(None)
+        return GLib.SOURCE_REMOVE
+
+    def _read_chunks(self):
+        """ copy chunks of rows to tuples, until the frame budget is used """
+        get_row = getattr(self.model, 'get_row', None)
+        columns = self.columns
+        deadline = time.monotonic() + self.frame_budget
+        while self.read < self.total and time.monotonic() < deadline:
+            end = min(self.read + self.chunk_rows, self.total)
+            if get_row is not None:
+                rows = [tuple(values.get(column) for column in columns)
+                        for values in map(get_row, self._rows[self.read:end])]
+            else:
+                row_func = self.row_func
+                rows = [tuple(row_func(item)) for item in self._rows[self.read:end]]
+            self._queue.put(rows)
+            self.read = end
+
+    def _on_resume(self):
+        self._source_id = GLib.idle_add(self._on_idle)
+        return GLib.SOURCE_REMOVE
+
+    def _run_writer(self, chunks):
+        completed = self._write(chunks)
+        GLib.idle_add(self._on_written, completed)
+
+    def _write(self, chunks) -> bool:
+        """ write the chunks of rows, runs in the writer thread """
+        tmp_fn = f'{self.fn}.part'
+        try:
+            with open(tmp_fn, 'w', encoding='utf-8', newline='', buffering=self.buffer_size) as f:
+                writer = csv.writer(f) if self.fmt == 'csv' else None
+                if writer:
+                    writer.writerow(self.columns)
+                else:
+                    # json.dumps with options makes a new encoder for every call
+                    encode = json.JSONEncoder(ensure_ascii=False, default=str).encode
+                    if self.fmt == 'json':
+                        f.write('[\n')
+                for rows in chunks:
+                    if self._cancelled:
+                        break
+                    if writer:
+                        writer.writerows(rows)
+                    elif rows:
+                        lines = [encode(dict(zip(self.columns, row))) for row in rows]
+                        if self.fmt == 'jsonl':
+                            f.write('\n'.join(lines) + '\n')
+                        else:
+                            # a json array, with a row on each line
+                            f.write((',\n' if self.written else '') + ',\n'.join(lines))
+                    self.written += len(rows)
+                    self._report_progress()
+                if self.fmt == 'json':
+                    f.write('\n]\n' if self.written else ']\n')
+            if self._cancelled:
+                os.remove(tmp_fn)
+                return False
+            os.replace(tmp_fn, self.fn)
+            return True
+        except Exception as e:
+            self.error = str(e)
+            self._cancelled = True
+            if os.path.exists(tmp_fn):
+                os.remove(tmp_fn)
+            return False
+
+    def _report_progress(self):
+        # at most 10 times a second
+        now = time.monotonic()
+        if now - self._last_progress > 0.1:
+            self._last_progress = now
+            GLib.idle_add(self._emit_progress, self.written / self.total)
+
+    def _emit_progress(self, fraction):
+        if self.running:
+            self.emit('progress', fraction)
+        return GLib.SOURCE_REMOVE
+
+    def _on_written(self, completed: bool):
+        self._stop_reading()
+        self.running = False
+        if self.error:
+            print(f"Error exporting to {self.fn} : {self.error}")
+        if completed:
+            self.emit('progress', 1.0)
+        self.emit('done', not completed)
+        return GLib.SOURCE_REMOVE
+
+
+class OptionListModel(GObject.GObject, Gio.ListModel):
+    """ Gio.ListModel with the options of a DropDown, where only the matches of the search is shown
+
+    options is strings or GObjects, Gtk.StringObjects for string options is only created
+    when they are requested. The search keys (casefolded labels) is computed once, when the
+    options is added, and joined in a single string, so a search is done by str.find.
+    """
+    cache_size = 1000
+
+    def __init__(self, item_type=Gtk.StringObject):
+        super(OptionListModel, self).__init__()
+        self.item_type = item_type
+        self.options = []
+        self.keys = []
+        self.query = ''
+        # indexes of the options matching the query (None = all)
+        self.matches = None
+        self._haystack = None
+        self._starts = []
+        self._cache = OrderedDict()
+
+    def do_get_item_type(self):
+        return self.item_type.__gtype__
+
+    def do_get_n_items(self):
+        return len(self.options) if self.matches is None else len(self.matches)
+
+    def do_get_item(self, position):
+        if position >= self.get_n_items():
+            return None
+        return self.get_option_item(position if self.matches is None else self.matches[position])
+
+    def get_option_item(self, ndx: int) -> GObject.GObject:
+        """ get the item for the option with index ndx """
+        option = self.options[ndx]
+        if not isinstance(option, str):
+            return option
+        item = self._cache.get(ndx)
+        if item is None:
+            item = Gtk.StringObject.new(option)
+            self._cache[ndx] = item
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(ndx)
+        return item
+
+    def get_index(self, position: int) -> int:
+        """ index in options of the item at position """
+        if position == Gtk.INVALID_LIST_POSITION or position >= self.get_n_items():
+            return Gtk.INVALID_LIST_POSITION
+        return position if self.matches is None else self.matches[position]
+
+    def get_position(self, ndx: int) -> int:
+        """ position of the option with index ndx (INVALID_LIST_POSITION if it is filtered out) """
+        if self.matches is None:
+            return ndx
+        pos = bisect_left(self.matches, ndx)
+        return pos if pos < len(self.matches) and self.matches[pos] == ndx else Gtk.INVALID_LIST_POSITION
+
+    def append(self, options: list, keys: list):
+        """ add options with their search keys """
+        old_size = self.get_n_items()
+        start = len(self.options)
+        self.options.extend(options)
+        self.keys.extend(keys)
+        self._haystack = None
+        if self.matches is None:
+            self.items_changed(old_size, 0, len(options))
+        else:
+            added = [start + ndx for ndx, key in enumerate(keys) if self.query in key]
+            self.matches.extend(added)
+            self.items_changed(old_size, 0, len(added))
+
+    def clear(self):
+        old_size = self.get_n_items()
+        self.options = []
+        self.keys = []
+        self.matches = None if self.matches is None else []
+        self._haystack = None
+        self._cache.clear()
+        self.items_changed(0, old_size, self.get_n_items())
+
+    def search(self, query: str):
+        """ only show the options there contains query (ignoring case) """
+        query = query.casefold().replace('\n', ' ')
+        if query == self.query:
+            return
+        old_size = self.get_n_items()
+        if not query:
+            matches = None
+        elif self.matches is not None and self.query in query and len(self.matches) < len(self.keys) // 4:
+            # the query is extended while typing, only search the last matches
+            keys = self.keys
+            matches = [ndx for ndx in self.matches if query in keys[ndx]]
+        else:
+            matches = self._find(query)
+        self.query = query
+        self.matches = matches
+        self.items_changed(0, old_size, self.get_n_items())
+
+    def _find(self, query: str) -> list:
+        if self._haystack is None:
+            self._haystack = '\n'.join(self.keys)
+            self._starts = list(accumulate((len(key) + 1 for key in self.keys[:-1]), initial=0))
+        haystack, starts = self._haystack, self._starts
+        matches = []
+        pos = haystack.find(query)
+        while pos >= 0:
+            ndx = bisect_right(starts, pos) - 1
+            matches.append(ndx)
+            # continue from the next option
+            if ndx + 1 >= len(starts):
+                break
+            pos = haystack.find(query, starts[ndx + 1])
+        return matches
+
+
+class DropDown(Gtk.DropDown):
+    """ Gtk.DropDown with search, for large number of options
+
+    The options can be a list, a generator (it is read in chunks, when the application is idle)
+    or a function, there is called in a worker thread and returns the options.
+    The options is strings, or GObjects with an expression to get their label, ex.
+        Gtk.PropertyExpression.new(MyItem, None, 'name')
+    The search is done on the precomputed search keys of the options, when the search entry changes,
+    and narrowed while the query is extended. Only the items of the visible rows is created.
+    The callback is called with the index of the selected option.
+    """
+    chunk_size = 5000
+
+    def __init__(self, options=None, expression: Gtk.Expression = None, item_type=Gtk.StringObject):
+        Gtk.DropDown.__init__(self)
+        self.expression = expression
+        self.store = OptionListModel(item_type)
+        self.selected_index = Gtk.INVALID_LIST_POSITION
+        self.callback = None
+        self.loading = False
+        self._loader = None
+        self._updating = False
+        factory = Gtk.SignalListItemFactory()
+        factory.connect('setup', self._on_factory_setup)
+        factory.connect('bind', self._on_factory_bind)
+        self.set_factory(factory)
+        self.set_model(self.store)
+        self.set_enable_search(True)
+        # The drop down search filter is not used (it would get all items on every search),
+        # the search entry is connected to the OptionListModel search instead.
+        # There is no public API for the search entry & popover, they are looked up in the
+        # GtkDropDown template (checked against gtkdropdown.ui in GTK 4.0 to 4.16)
+        self._search_entry = self._find_child(self, Gtk.SearchEntry)
+        popover = self._find_child(self, Gtk.Popover)
+        if self._search_entry is not None and popover is not None:
+            self._search_entry.connect('search-changed', self._on_search_changed)
+            popover.connect('closed', self._on_popup_closed)
+        else:
+            print('DropDown: the search entry of Gtk.DropDown is not found, the default search is used')
+            self._search_entry = None
+            self._use_default_search()
+        self.connect('notify::selected', self._on_selected)
+        if options is not None:
+            self.load(options)
+
+    def _use_default_search(self):
+        """ search with the filter of Gtk.DropDown, it evaluates the expression for all options """
+        expression = self.expression or Gtk.PropertyExpression.new(Gtk.StringObject, None, 'string')
+        self.set_expression(expression)
+        # GTK 4.12
+        if hasattr(self, 'set_search_match_mode'):
+            self.set_search_match_mode(Gtk.StringFilterMatchMode.SUBSTRING)
+
+    @classmethod
+    def _find_child(cls, widget: Gtk.Widget, widget_type):
+        for child in widget:
+            if isinstance(child, widget_type):
+                return child
+            found = cls._find_child(child, widget_type)
+            if found is not None:
+                return found
+        return None
+
+    def set_callback(self, callback):
+        """ callback(ndx) is called, when an option is selected """
+        self.callback = callback
+
+    def get_label(self, item: GObject.GObject) -> str:
+        if isinstance(item, Gtk.StringObject):
+            return item.get_string()
+        value = GObject.Value()
+        if self.expression is not None and self.expression.evaluate(item, value):
+            return str(value.get_value())
+        return str(item)
+
+    def get_selected_option(self):
+        """ the selected option (None if nothing is selected) """
+        if self.selected_index == Gtk.INVALID_LIST_POSITION:
+            return None
+        return self.store.options[self.selected_index]
+
+    def set_selected_index(self, ndx: int):
+        """ select the option with index ndx """
+        self.selected_index = ndx
+        self._updating = True
+        self.set_selected(self.store.get_position(ndx))
+        self._updating = False
+
+    def load(self, options):
+        """ replace the options with options from a list, a generator or a function (called in a worker thread) """
+        self._loader = None
+        self.store.clear()
+        self.selected_index = Gtk.INVALID_LIST_POSITION
+        if callable(options):
+            self.loading = True
+            self._loader = loader = object()
+            run_in_worker(lambda: self._get_keys(options()), lambda result: self._on_loaded(loader, result))
+        elif isinstance(options, (list, tuple)):
+            self._append(*self._get_keys(options))
+        else:
+            self.loading = True
+            self._loader = iter(options)
+            GLib.idle_add(self._load_chunk, self._loader, priority=GLib.PRIORITY_LOW)
+
+    def _get_keys(self, options) -> tuple:
+        options = list(options)
+        labels = options if not options or isinstance(options[0], str) else \
+            [self.get_label(option) for option in options]
+        return options, [label.casefold().replace('\n', ' ') for label in labels]
+
+    def _on_loaded(self, loader, result):
+        # skip it, if new options is loaded
+        if loader is not self._loader:
+            return
+        self.loading = False
+        self._loader = None
+        self._append(*result)
+
+    def _load_chunk(self, loader):
+        # stop if new options is loaded
+        if loader is not self._loader:
+            return GLib.SOURCE_REMOVE
+        chunk = [option for _, option in zip(range(self.chunk_size), loader)]
+        self._append(*self._get_keys(chunk))
+        if len(chunk) < self.chunk_size:
+            self.loading = False
+            self._loader = None
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def _append(self, options, keys):
+        self._updating = True
+        self.store.append(options, keys)
+        self._updating = False
+        if self.selected_index == Gtk.INVALID_LIST_POSITION and self.get_selected() != Gtk.INVALID_LIST_POSITION:
+            self.selected_index = self.store.get_index(self.get_selected())
+
+    def _on_search_changed(self, entry):
+        self._updating = True
+        self.store.search(entry.get_text())
+        self._updating = False
+
+    def _on_popup_closed(self, popover):
+        # show all options again, with the selected option selected
+        if self._search_entry is not None:
+            self._search_entry.set_text('')
+        self._updating = True
+        self.store.search('')
+        self.set_selected(self.store.get_position(self.selected_index))
+        self._updating = False
+
+    def _on_selected(self, widget, pspec):
+        if self._updating:
+            return
+        self.selected_index = self.store.get_index(self.get_selected())
+        if self.callback and self.selected_index != Gtk.INVALID_LIST_POSITION:
+            self.callback(self.selected_index)
+
+    def _on_factory_setup(self, factory, item: Gtk.ListItem):
+        label = Gtk.Label()
+        label.set_xalign(0)
+        label.set_ellipsize(Pango.EllipsizeMode.END)
+        item.set_child(label)
+
+    def _on_factory_bind(self, factory, item: Gtk.ListItem):
+        item.get_child().set_text(self.get_label(item.get_item()))
+
 
 class SearchBar(Gtk.SearchBar):
     """ Wrapper for Gtk.Searchbar Gtk.SearchEntry"""
@@ -470,20 +2775,286 @@ class SwitchRow(Gtk.Box):
         self.switch.set_state(state)
 
 
+class SessionState:
+    """ Window & widget state (size, paned positions, visible page, selection, scroll), saved between sessions
+
+    The state is restored when a widget is tracked, so call the track_* methods before
+    the window is presented. Changes are saved delay ms after the last change, the file is
+    written in a worker thread and replaced by an atomic rename. Call flush() on exit.
+    """
+
+    def __init__(self, fn: str, delay=1000):
+        self.fn = fn
+        self.delay = delay
+        self._state = {}
+        self._save_id = 0
+        self._generation = 0
+        self._written = 0
+        self._write_lock = threading.Lock()
+        try:
+            with open(fn) as f:
+                self._state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, key, default=None):
+        return self._state.get(key, default)
+
+    def set(self, key, value):
+        if self._state.get(key) == value:
+            return
+        self._state[key] = value
+        if self._save_id:
+            GLib.source_remove(self._save_id)
+        self._save_id = GLib.timeout_add(self.delay, self._on_save)
+
+    def _snapshot(self):
+        self._generation += 1
+        return self._generation, json.dumps(self._state, separators=(',', ':'))
+
+    def _on_save(self):
+        self._save_id = 0
+        run_in_worker(self._write, lambda result: None, *self._snapshot())
+        return GLib.SOURCE_REMOVE
+
+    def _write(self, generation, data):
+        with self._write_lock:
+            # a newer state is already written
+            if generation < self._written:
+                return
+            os.makedirs(os.path.dirname(self.fn) or '.', exist_ok=True)
+            tmp_fn = f'{self.fn}.tmp'
+            with open(tmp_fn, 'w') as f:
+                f.write(data)
+            os.replace(tmp_fn, self.fn)
+            self._written = generation
+
+    def flush(self):
+        """ write pending changes now """
+        if self._save_id:
+            GLib.source_remove(self._save_id)
+            self._save_id = 0
+            self._write(*self._snapshot())
+
+    def track_window(self, window: Gtk.Window, name='window'):
+        """ restore & save the window size and maximized state """
+        width, height = self.get(f'{name}.size', window.get_default_size())
+        window.set_default_size(width, height)
+        if self.get(f'{name}.maximized'):
+            window.maximize()
+        window.connect('notify::default-width', self._on_window_size, name)
+        window.connect('notify::default-height', self._on_window_size, name)
+        window.connect('notify::maximized', self._on_window_maximized, name)
+
+    def _on_window_size(self, window, pspec, name):
+        if not window.is_maximized():
+            self.set(f'{name}.size', list(window.get_default_size()))
+
+    def _on_window_maximized(self, window, pspec, name):
+        self.set(f'{name}.maximized', window.is_maximized())
+
+    def track_paned(self, paned: Gtk.Paned, name: str):
+        """ restore & save the position of a Gtk.Paned """
+        position = self.get(name)
+        if position is not None:
+            paned.set_position(position)
+        paned.connect('notify::position', lambda widget, pspec: self.set(name, widget.get_position()))
+
+    def track_stack(self, stack: Gtk.Stack, name='stack'):
+        """ restore & save the visible page of a Gtk.Stack """
+        page = self.get(name)
+        if page and stack.get_child_by_name(page):
+            stack.set_visible_child_name(page)
+        stack.connect('notify::visible-child-name',
+                      lambda widget, pspec: self.set(name, widget.get_visible_child_name()))
+
+    def track_list(self, view, name: str):
+        """ restore & save the selected row & scroll offset of a ListViewBase or ViewColumnBase
+        (only Gtk.SingleSelection is supported)
+        """
+        model = view.model
+        selected = self.get(f'{name}.selected')
+        if selected is not None and selected < model.get_n_items():
+            model.set_selected(selected)
+        model.connect('notify::selected', lambda widget, pspec: self.set(f'{name}.selected', widget.get_selected()))
+        # the adjustment is set, when the view is added to a Gtk.ScrolledWindow
+        scroll_widget = view.col_view if isinstance(view, Gtk.ColumnViewColumn) else view
+        scroll_widget.connect('notify::vadjustment', self._on_vadjustment, name)
+        self._on_vadjustment(scroll_widget, None, name)
+
+    def _on_vadjustment(self, widget, pspec, name):
+        adj = widget.get_vadjustment()
+        if adj is None:
+            return
+        offset = self.get(f'{name}.scroll')
+        if offset:
+            # restore the offset, when the content is large enough
+            def on_changed(adj):
+                if adj.get_upper() - adj.get_page_size() >= offset:
+                    adj.set_value(offset)
+                    adj.disconnect(handler_id)
+            handler_id = adj.connect('changed', on_changed)
+        adj.connect('value-changed', lambda adj: self.set(f'{name}.scroll', adj.get_value()))
+
+
+class MenuRegistry:
+    """ Cache of menu models parsed from Gtk.Builder xml strings
+
+    Each xml string is only parsed once, the resulting Gio.MenuModel objects
+    are shared by all widgets using the same menu.
+    """
+
+    def __init__(self):
+        self._builders = {}
+
+    def get_menu(self, xml: str, name: str) -> Gio.MenuModel:
+        builder = self._builders.get(xml)
+        if builder is None:
+            builder = Gtk.Builder()
+            builder.add_from_string(xml)
+            self._builders[xml] = builder
+        return builder.get_object(name)
+
+    def get_menu_from_file(self, fn: str, name: str) -> Gio.MenuModel:
+        """ get a menu from a ui file (or resource), the file is only parsed once """
+        builder = self._builders.get(fn)
+        if builder is None:
+            builder = load_builder(fn)
+            self._builders[fn] = builder
+        return builder.get_object(name)
+
+    def clear(self):
+        self._builders.clear()
+
+
+# Shared menu models used by MenuButton
+MENUS = MenuRegistry()
+
+
+class ActionEntry:
+    """ Declarative definition of an action
+
+    callback: callable or name of a method on the object the actions are registered for
+    accels: list of accelerators (ex. ['<Ctrl>q'])
+    state: initial boolean state for a stateful (toggle) action, None for a plain action
+    label: label used in menus, actions without a label is not shown in menus
+    group: title of the group the action is shown in on the shortcuts window
+    """
+
+    def __init__(self, name: str, callback, accels=None, state=None, label=None, group='General'):
+        self.name = name
+        self.callback = callback
+        self.accels = accels or []
+        self.state = state
+        self.label = label
+        self.group = group
+
+    def __repr__(self):
+        return f'ActionEntry(name: {self.name} accels: {self.accels} state: {self.state})'
+
+
+class ActionRegistry:
+    """ Table of ActionEntry, used to register actions in bulk
+
+    The same table is used to build a menu model and shortcuts window xml,
+    both are only built once and shared.
+    """
+
+    def __init__(self, entries: list, prefix='win'):
+        self.entries = entries
+        self.prefix = prefix
+        self._menu = None
+        self._shortcuts_xml = None
+
+    def register(self, action_map: Gio.ActionMap, app: Gtk.Application = None):
+        """ Add all actions to the action map and set accelerators in the application """
+        for entry in self.entries:
+            callback = entry.callback
+            if isinstance(callback, str):
+                callback = getattr(action_map, callback)
+            if entry.state is None:
+                action = Gio.SimpleAction.new(entry.name, None)
+                action.connect('activate', callback)
+            else:
+                action = Gio.SimpleAction.new_stateful(
+                    entry.name, None, GLib.Variant.new_boolean(entry.state))
+                action.connect('change-state', self._on_change_state, callback)
+            action_map.add_action(action)
+            if app and entry.accels:
+                app.set_accels_for_action(f'{self.prefix}.{entry.name}', entry.accels)
+
+    @staticmethod
+    def _on_change_state(action, value, callback):
+        action.set_state(value)
+        callback(action, value)
+
+    def get_menu(self) -> Gio.MenuModel:
+        """ Menu model with all actions with a label """
+        if self._menu is None:
+            menu = Gio.Menu()
+            for entry in self.entries:
+                if entry.label:
+                    menu.append(entry.label, f'{self.prefix}.{entry.name}')
+            self._menu = menu
+        return self._menu
+
+    def get_shortcuts_xml(self, name='shortcuts') -> str:
+        """ Gtk.Builder xml for a Gtk.ShortcutsWindow with all actions with accelerators """
+        if self._shortcuts_xml is None:
+            groups = {}
+            for entry in self.entries:
+                if entry.accels:
+                    groups.setdefault(entry.group, []).append(entry)
+            lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+                     '<interface>',
+                     f'<object class="GtkShortcutsWindow" id="{name}">',
+                     '<property name="modal">1</property>',
+                     '<child><object class="GtkShortcutsSection">',
+                     f'<property name="section-name">{name}</property>']
+            for group, entries in groups.items():
+                lines.append('<child><object class="GtkShortcutsGroup">')
+                lines.append(f'<property name="title">{escape(group)}</property>')
+                for entry in entries:
+                    title = (entry.label or entry.name).replace('_', '')
+                    lines.append('<child><object class="GtkShortcutsShortcut">')
+                    lines.append(f'<property name="accelerator">{escape(" ".join(entry.accels))}</property>')
+                    lines.append(f'<property name="title">{escape(title)}</property>')
+                    lines.append('</object></child>')
+                lines.append('</object></child>')
+            lines += ['</object></child>', '</object>', '</interface>']
+            self._shortcuts_xml = '\n'.join(lines)
+        return self._shortcuts_xml
+
+
 class MenuButton(Gtk.MenuButton):
     """
     Wrapper class for at Gtk.Menubutton with a menu defined
-    in a Gtk.Builder xml string
+    in a Gtk.Builder xml string, a Gio.MenuModel or a function returning a Gio.MenuModel
+
+    A menu from xml or a function is first created, when the menu is opened the first time
     """
 
     def __init__(self, xml, name, icon_name='open-menu-symbolic'):
         super(MenuButton, self).__init__()
-        builder = Gtk.Builder()
-        builder.add_from_string(xml)
-        menu = builder.get_object(name)
-        self.set_menu_model(menu)
+        if isinstance(xml, Gio.MenuModel):
+            self.set_menu_model(xml)
+        else:
+            self._xml = xml
+            self._name = name
+            self.set_create_popup_func(self._on_create_popup)
         self.set_icon_name(icon_name)
 
+    def _on_create_popup(self, button):
+        # it is called each time the menu is opened, the menu is only build the first time
+        if self.get_menu_model() is not None:
+            return
+        if callable(self._xml):
+            menu = self._xml()
+        else:
+            # the xml is only parsed the first time it is used
+            menu = MENUS.get_menu(self._xml, self._name)
+        self.set_menu_model(menu)
+
 
 class Stack(Gtk.Stack):
     """ Wrapper for Gtk.Stack with  with a StackSwitcher """
@@ -501,6 +3072,354 @@ class Stack(Gtk.Stack):
         self._pages[name] = page
         return page
 
+    def add_template_page(self, name, title, page_cls, *args):
+        """ create a TemplatePage and add it as a new page """
+        return self.add_page(name, title, page_cls(*args))
+
+
+class TemplatePage(Gtk.Box):
+    """ Stack page with the widget tree defined in a ui file
+
+    Subclasses must be decorated with ui_template(fn) and set __gtype_name__ to the class
+    of the <template> in the ui file. The whole widget tree is build by Gtk.Builder in one pass,
+    instead of a Python call for each property & child.
+
+    Children used from Python is declared as TemplateChild attributes, the signal handlers
+    in the ui file is connected by name to the methods decorated with Gtk.Template.Callback.
+    The children named in exports is set as attributes on the window by Window.add_template_page
+    """
+    exports = ()
+
+    def __init__(self, win: Gtk.Window):
+        super(TemplatePage, self).__init__()
+        # it is a noop, if the template already is initialized by PyGObject
+        self.init_template()
+        self.win = win
+        self.check_children()
+
+    def check_children(self):
+        for name, child in vars(type(self)).items():
+            if isinstance(child, TemplateChild):
+                widget = getattr(self, name, None)
+                if not isinstance(widget, child.child_type):
+                    raise TypeError(f'{type(self).__name__}.{name} : expected {child.child_type.__name__}, '
+                                    f'got {type(widget).__name__}')
+
+
+class MetricsPage(Gtk.ScrolledWindow):
+    """ Debug page showing the FactoryMetrics of all views, updated every second while shown """
+
+    def __init__(self):
+        super(MetricsPage, self).__init__()
+        self.label = Gtk.Label()
+        self.label.set_selectable(True)
+        self.label.set_halign(Gtk.Align.START)
+        self.label.set_valign(Gtk.Align.START)
+        self.label.set_margin_start(20)
+        self.label.set_margin_top(20)
+        self.label.set_attributes(get_text_style(font='Monospace 10'))
+        self.set_child(self.label)
+        self._timer_id = 0
+        self.connect('map', self.on_map)
+        self.connect('unmap', self.on_unmap)
+
+    def on_map(self, widget):
+        self.refresh()
+        self._timer_id = GLib.timeout_add_seconds(1, self.refresh)
+
+    def on_unmap(self, widget):
+        if self._timer_id:
+            GLib.source_remove(self._timer_id)
+            self._timer_id = 0
+
+    def refresh(self):
+        lines = [f'{"view":<24}{"rows":>6}{"setup":>8}{"bind":>8}{"unbind":>8}{"teardown":>9}'
+                 f'{"bind avg us":>12}{"bind max us":>12}{"sel/s":>7}']
+        for metrics in FactoryMetrics.get_all():
+            data = metrics.to_dict()
+            counts = data['counts']
+            lines.append(f'{metrics.name:<24}{metrics.live_rows:>6}{counts["setup"]:>8}{counts["bind"]:>8}'
+                         f'{counts["unbind"]:>8}{counts["teardown"]:>9}{data["mean_us"]["bind"]:>12.1f}'
+                         f'{data["max_us"]["bind"]:>12.1f}{data["selection_rate"]:>7.1f}')
+            histogram = '  '.join(f'{bucket}: {count}' for bucket, count in data['bind_histogram_us'].items())
+            lines.append(f'    bind us  {histogram}')
+        self.label.set_text('\n'.join(lines))
+        return GLib.SOURCE_CONTINUE
+
+
+class CommandTitles:
+    """ The titles of a command source, indexed for search
+
+    The lower case titles is joined in strings of block_size titles, so the matching is done by the
+    regex engine. A change only rebuilds the blocks containing the changed titles (see splice)
+    """
+    block_size = 1024
+
+    def __init__(self, titles: list, activate):
+        self.titles = list(titles)
+        self.texts = [self.normalize(title) for title in self.titles]
+        self.activate = activate
+        # list of [haystack, starts, number of titles]
+        self.blocks = self._build(0, len(self.texts))
+
+    @staticmethod
+    def normalize(title: str) -> str:
+        return title.lower().replace('\n', ' ')
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _build(self, start: int, end: int) -> list:
+        blocks = []
+        for pos in range(start, end, self.block_size):
+            texts = self.texts[pos:min(pos + self.block_size, end)]
+            starts = list(accumulate((len(text) + 1 for text in texts[:-1]), initial=0))
+            blocks.append(['\n'.join(texts), starts, len(texts)])
+        return blocks
+
+    def splice(self, position: int, removed: int, titles: list):
+        """ replace removed titles at position with titles (like Gio.ListModel::items-changed) """
+        self.titles[position:position + removed] = titles
+        self.texts[position:position + removed] = [self.normalize(title) for title in titles]
+        # find the blocks there contains the changed range
+        first = start = 0
+        while first < len(self.blocks) - 1 and start + self.blocks[first][2] <= position:
+            start += self.blocks[first][2]
+            first += 1
+        last, end = first, start
+        if self.blocks:
+            end += self.blocks[first][2]
+        while end < position + removed and last < len(self.blocks) - 1:
+            last += 1
+            end += self.blocks[last][2]
+        self.blocks[first:last + 1] = self._build(start, end + len(titles) - removed)
+
+    def finditer(self, pattern):
+        """ the title indexes matching a compiled pattern """
+        base = 0
+        for haystack, starts, count in self.blocks:
+            for match in pattern.finditer(haystack):
+                yield base + bisect_right(starts, match.start()) - 1
+            base += count
+
+
+class CommandIndex:
+    """ Searchable index of commands from a number of sources
+
+    A source is a function returning (titles, activate), where activate(ndx) runs the
+    command with titles[ndx]. The titles of a source is indexed by build_next (the CommandPalette
+    does it while it is opened) or the first time it is searched, and only indexed again, when the source is marked as changed with invalidate(name).
+    If the source has a get_titles(position, n) function, a change can be applied
+    with update(name, position, removed, added) and only the changed titles is indexed again.
+
+    Only the first max_candidates matches is scored in python.
+    """
+    max_candidates = 5000
+
+    def __init__(self):
+        self._sources = {}
+        self._get_titles = {}
+        self._index = {}
+        # last query and its matches, used to narrow the search while typing
+        self._last = ('', None)
+
+    def add_source(self, name: str, func, get_titles=None):
+        self._sources[name] = func
+        self._get_titles[name] = get_titles
+        self.invalidate(name)
+
+    def remove_source(self, name: str):
+        self._sources.pop(name, None)
+        self._get_titles.pop(name, None)
+        self.invalidate(name)
+
+    def invalidate(self, name: str):
+        """ the source is changed, index it again on next search """
+        self._index.pop(name, None)
+        self._last = ('', None)
+
+    def update(self, name: str, position: int, removed: int, added: int):
+        """ the source is changed, only the added titles is indexed (if the source has get_titles) """
+        index = self._index.get(name)
+        get_titles = self._get_titles.get(name)
+        if index is None or get_titles is None:
+            self.invalidate(name)
+            return
+        index.splice(position, removed, get_titles(position, added))
+        self._last = ('', None)
+
+    def build_next(self) -> bool:
+        """ index the next source there is not indexed yet, returns False when all is indexed """
+        for name in self._sources:
+            if name not in self._index:
+                self._get_index(name)
+                return True
+        return False
+
+    def _get_index(self, name) -> CommandTitles:
+        index = self._index.get(name)
+        if index is None:
+            index = CommandTitles(*self._sources[name]())
+            self._index[name] = index
+        return index
+
+    @staticmethod
+    def score(query: str, text: str) -> float:
+        """ Fuzzy match score, higher is better
+        substring matches ranks over fuzzy matches, matches at word start & short titles ranks first
+        """
+        pos = text.find(query)
+        if pos >= 0:
+            score = 1000 - pos
+            if pos == 0 or not text[pos - 1].isalnum():
+                score += 500
+        else:
+            score = 0
+            last = -2
+            pos = 0
+            for char in query:
+                pos = text.find(char, pos)
+                if pos == last + 1:
+                    score += 10
+                if pos == 0 or not text[pos - 1].isalnum():
+                    score += 5
+                last = pos
+                pos += 1
+        return score - len(text) / 100
+
+    def search(self, query: str, limit=50) -> list:
+        """ Returns the best matches as a list of (title, source name, ndx) """
+        query = query.strip().lower()
+        if not query:
+            return []
+        literal = re.compile(re.escape(query))
+        fuzzy = re.compile('[^\n]*?'.join(re.escape(char) for char in query))
+        last_query, last_scores = self._last
+        if last_scores is not None and query.startswith(last_query):
+            # the query is extended, so only the matches of last query can match
+            scores = {}
+            for (name, ndx) in last_scores:
+                text = self._get_index(name).texts[ndx]
+                if fuzzy.search(text):
+                    scores[(name, ndx)] = self.score(query, text)
+            complete = True
+        else:
+            scores, complete = self._search_all(query, [literal, fuzzy], limit)
+        # only use the matches to narrow the next search, if all matches was found
+        self._last = (query, scores if complete else None)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(self._index[name].titles[ndx], name, ndx) for (name, ndx), score in best]
+
+    def _search_all(self, query, patterns, limit):
+        """ search all sources, returns the scores and True if all matches was found """
+        scores = {}
+        for pattern in patterns:
+            # fuzzy matching is slow, so skip it, if there is enough substring matches
+            if pattern is patterns[-1] and len(scores) >= limit:
+                return scores, False
+            # small sources (actions, pages) first, so they are not left out by max_candidates
+            for name in sorted(self._sources, key=lambda name: len(self._get_index(name))):
+                index = self._get_index(name)
+                for ndx in index.finditer(pattern):
+                    if (name, ndx) not in scores:
+                        scores[(name, ndx)] = self.score(query, index.texts[ndx])
+                        if len(scores) >= self.max_candidates:
+                            return scores, False
+        return scores, True
+
+    def activate(self, name: str, ndx: int):
+        self._get_index(name).activate(ndx)
+
+
+class CommandList(ListViewStrings):
+    """ ListView with the results in the CommandPalette """
+
+    def factory_setup(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        label = Gtk.Label()
+        label.set_halign(Gtk.Align.START)
+        label.set_margin_start(10)
+        item.set_child(label)
+
+    def factory_bind(self, widget: Gtk.ListView, item: Gtk.ListItem):
+        item.get_child().set_text(item.get_item().get_string())
+
+    def selection_changed(self, widget, ndx):
+        pass
+
+
+class CommandPalette(Gtk.Window):
+    """ Popup to search & run commands from a CommandIndex """
+
+    def __init__(self, parent: Gtk.Window, index: CommandIndex):
+        super(CommandPalette, self).__init__()
+        self.index = index
+        self._results = []
+        self._build_id = 0
+        self.set_transient_for(parent)
+        self.set_modal(True)
+        self.set_decorated(False)
+        self.set_hide_on_close(True)
+        self.set_default_size(500, 400)
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        box.set_spacing(5)
+        self.entry = Gtk.SearchEntry()
+        self.entry.connect('search-changed', self.on_search_changed)
+        self.entry.connect('activate', self.on_entry_activate)
+        self.entry.connect('stop-search', lambda entry: self.close())
+        # move in the results with up/down, while typing in the entry
+        keys = Gtk.EventControllerKey()
+        keys.connect('key-pressed', self.on_key_pressed)
+        self.entry.add_controller(keys)
+        box.append(self.entry)
+        self.list = CommandList()
+        self.list.connect('activate', lambda view, ndx: self.run(ndx))
+        sw = Gtk.ScrolledWindow()
+        sw.set_vexpand(True)
+        sw.set_child(self.list)
+        box.append(sw)
+        self.set_child(box)
+
+    def popup(self):
+        self.entry.set_text('')
+        self.present()
+        self.entry.grab_focus()
+        # index the sources while the palette is opened, so the first search don't do it
+        if not self._build_id:
+            self._build_id = GLib.idle_add(self._on_build_index)
+
+    def _on_build_index(self):
+        # one source per idle call
+        if self.index.build_next():
+            return GLib.SOURCE_CONTINUE
+        self._build_id = 0
+        return GLib.SOURCE_REMOVE
+
+    def on_search_changed(self, entry):
+        self._results = self.index.search(entry.get_text())
+        store = self.list.store
+        store.splice(0, store.get_n_items(), [title for title, name, ndx in self._results])
+        if self._results:
+            self.list.model.set_selected(0)
+
+    def on_key_pressed(self, controller, keyval, keycode, state):
+        selected = self.list.model.get_selected()
+        if keyval == Gdk.KEY_Down and selected + 1 < len(self._results):
+            self.list.model.set_selected(selected + 1)
+            return True
+        if keyval == Gdk.KEY_Up and 0 < selected < len(self._results):
+            self.list.model.set_selected(selected - 1)
+            return True
+        return False
+
+    def on_entry_activate(self, entry):
+        self.run(self.list.model.get_selected())
+
+    def run(self, ndx):
+        if 0 <= ndx < len(self._results):
+            title, name, source_ndx = self._results[ndx]
+            self.close()
+            self.index.activate(name, source_ndx)
+
 
 class Window(Gtk.ApplicationWindow):
     """ custom Gtk.ApplicationWindow with a headerbar"""
@@ -515,18 +3434,16 @@ class Window(Gtk.ApplicationWindow):
         self.headerbar.set_title_widget(label)
         # custom CSS provider
         self.css_provider = None
+        # command palette (see add_command_palette)
+        self.commands = None
+        self.palette = None
+        self._action_titles = {}
 
     def load_css(self, css_fn):
-        """create a provider for custom styling"""
-        if css_fn and os.path.exists(css_fn):
-            css_provider = Gtk.CssProvider()
-            try:
-                css_provider.load_from_path(css_fn)
-            except GLib.Error as e:
-                print(f"Error loading CSS : {e} ")
-                return None
-            print(f'loading custom styling : {css_fn}')
-            self.css_provider = css_provider
+        """create a provider for custom styling, used by add_custom_styling
+        css_fn can be a file in the resource bundle, a resource:// uri or a path
+        """
+        self.css_provider = load_css(css_fn)
 
     def _add_widget_styling(self, widget):
         if self.css_provider:
@@ -545,3 +3462,100 @@ class Window(Gtk.ApplicationWindow):
         action = Gio.SimpleAction.new(name, None)
         action.connect("activate", callback)
         self.add_action(action)
+
+    def add_debug_page(self, stack: Stack, name='debug', title='Debug'):
+        """ add a page with the list factory metrics to a stack """
+        return stack.add_page(name, title, MetricsPage())
+
+    def add_template_page(self, stack: Stack, name, title, page_cls):
+        """ add a TemplatePage for this window to a stack and set the exported children on the window """
+        page = stack.add_template_page(name, title, page_cls, self)
+        widget = page.get_child()
+        for attr in widget.exports:
+            setattr(self, attr, getattr(widget, attr))
+        return page
+
+    def add_actions(self, registry: ActionRegistry):
+        """ Add all actions from an ActionRegistry and set their accelerators """
+        registry.register(self, self.get_application())
+        for entry in registry.entries:
+            if entry.label:
+                self._action_titles[entry.name] = entry.label.replace('_', '')
+        if self.commands:
+            self.commands.invalidate('actions')
+
+    def add_command_palette(self, accel='<Ctrl>p'):
+        """ Add a command palette, searching the window actions, shown by accel
+
+        Use add_stack_commands & add_list_commands to add more to search in
+        """
+        self.commands = CommandIndex()
+        self.commands.add_source('actions', self._get_action_commands)
+        self.connect('action-added', lambda group, name: self.commands.invalidate('actions'))
+        self.connect('action-removed', lambda group, name: self.commands.invalidate('actions'))
+        self.create_action('command-palette', lambda action, param: self.show_command_palette())
+        self.get_application().set_accels_for_action('win.command-palette', [accel])
+
+    def show_command_palette(self):
+        if self.palette is None:
+            self.palette = CommandPalette(self, self.commands)
+        self.palette.popup()
+
+    def _get_action_commands(self):
+        names = sorted(name for name in self.list_actions() if name != 'command-palette')
+        titles = [self._action_titles.get(name, name) for name in names]
+        return titles, lambda ndx: self.activate_action(f'win.{names[ndx]}', None)
+
+    def add_stack_commands(self, stack: Gtk.Stack, name='pages'):
+        """ search the page titles of a Gtk.Stack in the command palette """
+
+        def get_commands():
+            pages = list(stack.get_pages())
+            titles = [f'Go to {page.get_title() or page.get_name()}' for page in pages]
+            return titles, lambda ndx: stack.set_visible_child(pages[ndx].get_child())
+
+        self.commands.add_source(name, get_commands)
+        stack.get_pages().connect('items-changed', lambda *args: self.commands.invalidate(name))
+
+    def add_list_commands(self, name: str, view, get_title):
+        """ search the rows of a ListViewBase or ViewColumnBase in the command palette
+        get_title(elem) returns the text to search for a data element
+        """
+
+        def get_commands():
+            return [get_title(elem) for elem in view.store], lambda ndx: self._select_row(view, ndx)
+
+        def get_titles(position, n):
+            return [get_title(view.store.get_item(ndx)) for ndx in range(position, position + n)]
+
+        self.commands.add_source(name, get_commands, get_titles)
+        view.store.connect('items-changed', lambda store, position, removed, added:
+                           self.commands.update(name, position, removed, added))
+
+    @staticmethod
+    def _select_row(view, ndx):
+        widget = view.col_view if isinstance(view, Gtk.ColumnViewColumn) else view
+        # show the stack page containing the view
+        child = widget
+        while child.get_parent() is not None:
+            parent = child.get_parent()
+            if isinstance(parent, Gtk.Stack):
+                parent.set_visible_child(child)
+                break
+            child = parent
+        view.model.set_selected(ndx)
+        flags = Gtk.ListScrollFlags.FOCUS | Gtk.ListScrollFlags.SELECT if hasattr(Gtk, 'ListScrollFlags') else None
+        if isinstance(widget, Gtk.ColumnView):
+            if flags is not None:
+                # Gtk 4.12
+                widget.scroll_to(ndx, None, flags, None)
+                return
+            # before GTK 4.12 there is no public API, the rows is in a (private) list view
+            # inside the column view, it has the scroll-to-item action
+            widget = next((child for child in widget if isinstance(child, Gtk.ListView)), None)
+            if widget is None:
+                return
+        elif flags is not None:
+            widget.scroll_to(ndx, flags, None)
+            return
+        widget.activate_action('list.scroll-to-item', GLib.Variant.new_uint32(ndx))